@@ -0,0 +1,274 @@
+"""
+測驗引擎熱點路徑的 benchmark：以 voc.xlsx 相同欄位產生合成題庫 (預設 1k/10k/100k，可加 1M)，
+不經終端互動、以腳本答題驅動測驗引擎 (submit_answer)，回報各操作延遲百分位數與峰值記憶體，
+並可存成 baseline 供之後比對效能退步。另外以子行程量測 quiz.py 冷/熱啟動到第一個選單提示的時間。
+
+    python bench.py --sizes 1000,10000,100000 --save-baseline bench_baseline.json
+    python bench.py --compare bench_baseline.json
+    python bench.py --sizes '' --startup-runs 10 --startup-target-ms 250
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from terminal import QuizApp
+from storage import DeckStorage, ExcelStorage, load_deck
+
+
+QUIZ_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz.py")
+PROMPT = "請輸入選項".encode('utf-8')
+ROOT_COLUMNS = ["Root", "meaning"]
+VOC_COLUMNS = ["Voc", "Sentence", "translation", "Memorize"]
+LETTERS = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+
+
+def random_words(rng, count, min_len=4, max_len=12):
+    lengths = rng.integers(min_len, max_len + 1, count)
+    letters = LETTERS[rng.integers(0, len(LETTERS), lengths.sum())]
+    bounds = np.concatenate(([0], np.cumsum(lengths)))
+    text = ''.join(letters)
+    return [text[bounds[i]:bounds[i + 1]] for i in range(count)]
+
+
+def synthetic_deck(rows, seed=0, reviewed=0.4, now=None):
+    """
+    產生 voc.xlsx 格式的合成題庫 (Excel 讀入時的原始型別，時間欄位為字串)
+    reviewed 比例的題目有作答紀錄，到期日分散在前後 30 天
+    """
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp(now or pd.Timestamp.now().floor('s'))
+    voc = random_words(rng, rows)
+    data = pd.DataFrame({
+        "Root": random_words(rng, rows, 2, 5),
+        "meaning": [f"意思{i}" for i in range(rows)],
+        "Voc": voc,
+        "Memorize": [f"{word} 的記憶法" for word in voc],
+        "Sentence": [f"an example sentence with {word}" for word in voc],
+        "translation": [f"例句翻譯{i}" for i in range(rows)],
+    })
+
+    has_history = rng.random(rows) < reviewed
+    last = now - pd.to_timedelta(rng.integers(1, 60 * 86400, rows), unit='s')
+    due = now + pd.to_timedelta(rng.integers(-30 * 86400, 30 * 86400, rows), unit='s')
+    data['last_reviewed'] = np.where(has_history, last.strftime('%Y-%m-%d %H:%M:%S'), '')
+    data['review_count'] = np.where(has_history, rng.integers(0, 5, rows), 0)
+    data['next_review_date'] = np.where(has_history, due.strftime('%Y-%m-%d %H:%M:%S'), '')
+    data['review_interval'] = np.where(has_history, rng.integers(1, 30, rows), 0)
+    data['consecutive_correct'] = np.where(has_history, rng.integers(0, 3, rows), 0)
+    data['total_reviews'] = np.where(has_history, rng.integers(1, 10, rows), 0)
+    data['ease_factor'] = np.where(has_history, np.round(rng.uniform(1.3, 2.8, rows), 2), 2.5)
+    return data
+
+
+class Recorder:
+    """各操作的耗時樣本 (秒)"""
+
+    def __init__(self):
+        self.samples = {}
+
+    @contextlib.contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(name, []).append(time.perf_counter() - start)
+
+    def summary(self):
+        result = {}
+        for name, values in self.samples.items():
+            values = np.asarray(values) * 1000
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            result[name] = {'n': len(values), 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': values.max()}
+        return result
+
+
+def drive_session(app, answers, recorder, accuracy=0.7, seed=0):
+    """以腳本答題跑 answers 題：accuracy 比例答對，其餘輸入錯字或空白"""
+    rng = np.random.default_rng(seed)
+    app.burst_mode = True  # 不受每日配額限制，才能連續量測
+    for i in range(answers):
+        required_columns, answer_key = (VOC_COLUMNS, "Voc") if i % 2 else (ROOT_COLUMNS, "Root")
+        with recorder.time('get_priority_question'):
+            question = app.get_priority_question(required_columns)
+        if question is None:
+            break
+        user_input = question[answer_key] if rng.random() < accuracy else "zzz"
+        elapsed = float(rng.uniform(0.5, app.time_limit))
+        with recorder.time('submit_answer'):
+            app.submit_answer(question, user_input, elapsed, answer_key)
+        with recorder.time('display_progress'):
+            app.display_progress()
+
+
+def bench_size(rows, answers, seed, excel_max, workdir):
+    """單一題庫大小的量測；回傳 {操作: 百分位數} 與峰值記憶體"""
+    recorder = Recorder()
+    raw = synthetic_deck(rows, seed)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if rows <= excel_max:
+            path = os.path.join(workdir, f"deck_{rows}.xlsx")
+            raw.to_excel(path, index=False)
+            with recorder.time('read_excel'):
+                pd.read_excel(path)
+            with recorder.time('load_deck (cold)'):
+                load_deck(path)
+            with recorder.time('load_deck (cached)'):
+                load_deck(path)
+
+        with recorder.time('build_app'):
+            app = QuizApp(5, raw.copy(), 'bench', seed=seed, storage=DeckStorage())
+        drive_session(app, answers, recorder, seed=seed)
+        for _ in range(5):
+            with recorder.time('calculate_daily_progress'):
+                app.calculate_daily_progress()
+
+        if rows <= excel_max:
+            app.storage = ExcelStorage(path)
+            with recorder.time('save_progress'):
+                app.save_progress()
+
+        # 峰值記憶體另外量 (tracemalloc 會拖慢上面的計時)
+        tracemalloc.start()
+        app = QuizApp(5, raw.copy(), 'bench', seed=seed, storage=DeckStorage())
+        drive_session(app, min(answers, 200), Recorder(), seed=seed)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {'ops': recorder.summary(), 'peak_mb': peak / 2 ** 20}
+
+
+def measure_startup(path, runs, cold):
+    """
+    啟動 quiz.py 子行程，量測到第一個選單提示出現的時間 (秒)，之後關閉 stdin 讓它不存檔結束
+    cold 時每次先刪除題庫快取與統計摘要
+    """
+    samples = []
+    for _ in range(runs):
+        if cold:
+            for suffix in ('.cache', '.summary.json'):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path + suffix)
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, QUIZ_PATH, '--file', path],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        output = b''
+        while PROMPT not in output:
+            chunk = proc.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError("quiz.py 在顯示選單前結束")
+            output += chunk
+        samples.append(time.perf_counter() - start)
+        proc.communicate(b'')
+    return samples
+
+
+def bench_startup(rows, runs, seed, workdir):
+    recorder = Recorder()
+    path = os.path.join(workdir, f"startup_{rows}.xlsx")
+    synthetic_deck(rows, seed).to_excel(path, index=False)
+    recorder.samples['first_prompt (cold)'] = measure_startup(path, runs, cold=True)
+    recorder.samples['first_prompt (warm)'] = measure_startup(path, runs, cold=False)
+    return recorder.summary()
+
+
+def print_report(results):
+    for rows, result in results.items():
+        print(f"\n=== {int(rows):,} 題 (峰值記憶體 {result['peak_mb']:.1f} MB) ===")
+        print(f"{'操作':<28} {'次數':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+        for name, stats in result['ops'].items():
+            print(f"{name:<28} {stats['n']:>6} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+                  f"{stats['p99_ms']:>10.3f} {stats['max_ms']:>10.3f}")
+
+
+def compare(results, baseline, threshold):
+    """與 baseline 比較 p50/p95 與峰值記憶體，回傳退步項目"""
+    regressions = []
+    for rows, result in results.items():
+        base = baseline.get(rows)
+        if base is None:
+            continue
+        for name, stats in result['ops'].items():
+            base_stats = base['ops'].get(name)
+            if base_stats is None:
+                continue
+            for key in ('p50_ms', 'p95_ms'):
+                # 極短的操作容易受雜訊影響，差距小於 0.05 ms 不計
+                if stats[key] > base_stats[key] * threshold and stats[key] - base_stats[key] > 0.05:
+                    regressions.append(f"{rows} 題 {name} {key}: {base_stats[key]:.3f} -> {stats[key]:.3f}")
+        if result['peak_mb'] > base['peak_mb'] * threshold:
+            regressions.append(f"{rows} 題 峰值記憶體: {base['peak_mb']:.1f} -> {result['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="量測測驗引擎各操作在不同題庫大小下的延遲與記憶體")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="題庫大小，逗號分隔 (可加 1000000)")
+    parser.add_argument("--answers", type=int, default=500, help="每個大小模擬的作答數")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--excel-max", type=int, default=100000,
+                        help="超過此題數時略過 Excel 讀寫量測 (xlsx 寫入很慢)")
+    parser.add_argument("--save-baseline", metavar="JSON", help="把結果存成 baseline")
+    parser.add_argument("--compare", metavar="JSON", help="與 baseline 比較，退步時以非零狀態結束")
+    parser.add_argument("--threshold", type=float, default=1.25, help="超過 baseline 多少倍視為退步")
+    parser.add_argument("--startup-runs", type=int, default=5, help="quiz.py 啟動時間的量測次數 (0 為略過)")
+    parser.add_argument("--startup-rows", type=int, default=10000, help="量測啟動時間所用的題庫大小")
+    parser.add_argument("--startup-target-ms", type=float, default=250,
+                        help="啟動到第一個提示的 p50 上限，超過時以非零狀態結束")
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(',') if value.strip()]
+    results = {}
+    startup = None
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in sizes:
+            start = time.perf_counter()
+            results[str(rows)] = bench_size(rows, args.answers, args.seed, args.excel_max, workdir)
+            print(f"{rows:,} 題完成，耗時 {time.perf_counter() - start:.1f} 秒", file=sys.stderr)
+        if args.startup_runs > 0:
+            startup = bench_startup(args.startup_rows, args.startup_runs, args.seed, workdir)
+    print_report(results)
+
+    slow_startup = []
+    if startup is not None:
+        print(f"\n=== quiz.py 啟動到第一個提示 ({args.startup_rows:,} 題，目標 p50 < {args.startup_target_ms:.0f} ms) ===")
+        print(f"{'操作':<28} {'次數':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+        for name, stats in startup.items():
+            print(f"{name:<28} {stats['n']:>6} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+                  f"{stats['p99_ms']:>10.3f} {stats['max_ms']:>10.3f}")
+            if stats['p50_ms'] > args.startup_target_ms:
+                slow_startup.append(f"{name} p50 {stats['p50_ms']:.0f} ms")
+        if slow_startup:
+            print("啟動時間超過目標：" + ", ".join(slow_startup))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nbaseline 已寫入 {args.save_baseline}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n效能退步 (超過 baseline {args.threshold} 倍)：")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("\n與 baseline 相比沒有退步。")
+    if slow_startup:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from scheduler import NAT
+from schema import META_DEFAULTS, TIME_COLUMNS, COUNTER_DTYPES, to_seconds
+
+
+class CardStore:
+    """
+    作答期間的卡片狀態：每個 meta 欄位一條連續的 NumPy 陣列 (依 DataFrame 的列順序)
+    - 時間欄位存成 epoch 秒數 (int64，從未複習者為 NAT)
+    - Root/Voc/Sentence 等文字欄位留在原 DataFrame (或另外傳入、多人共用的 content)，用到時才取出該欄的陣列
+    - 作答只改陣列，存檔 (sync/to_frame) 時才寫回 DataFrame
+    """
+
+    __slots__ = ('data', 'content', 'labels', '_text') + tuple(META_DEFAULTS)
+
+    def __init__(self, data, content=None):
+        self.data = data
+        self.content = data if content is None else content
+        self.labels = data.index
+        self._text = {}
+        for col in META_DEFAULTS:
+            if col in TIME_COLUMNS:
+                values = to_seconds(data[col])
+            elif col in COUNTER_DTYPES:
+                values = data[col].to_numpy(dtype=COUNTER_DTYPES[col])
+            else:
+                values = data[col].to_numpy(dtype=float)
+            setattr(self, col, np.array(values))
+
+    @classmethod
+    def from_arrays(cls, content, arrays, text=None):
+        """
+        多人共用題庫時使用：meta 陣列 (時間欄位為 epoch 秒數) 由呼叫端提供，不另外建立個人的 DataFrame
+        labels 直接使用 content.index，題目位置的查詢表由所有學生共用；text 可傳入共用的文字欄陣列快取
+        """
+        store = cls.__new__(cls)
+        store.data = None
+        store.content = content
+        store.labels = content.index
+        store._text = {} if text is None else text
+        for col in META_DEFAULTS:
+            setattr(store, col, arrays[col])
+        return store
+
+    def __len__(self):
+        return len(self.labels)
+
+    def pos(self, label):
+        """題目索引 -> 陣列位置"""
+        return self.labels.get_loc(label)
+
+    def positions(self, labels):
+        return self.labels.get_indexer(labels)
+
+    def is_new(self, pos=slice(None)):
+        """從未作答過的新題"""
+        return (self.review_count[pos] == 0) & (self.last_reviewed[pos] == NAT)
+
+    def text(self, pos, col, default=''):
+        """文字欄位；整欄陣列第一次用到時才取出"""
+        values = self._text.get(col)
+        if values is None:
+            if col not in self.content.columns:
+                return default
+            values = self._text[col] = self.content[col].to_numpy()
+        return values[pos]
+
+    def value(self, pos, col):
+        """單一 meta 欄位的值 (時間欄位轉回 Timestamp/NaT)"""
+        value = getattr(self, col)[pos]
+        if col in TIME_COLUMNS:
+            return pd.Timestamp(np.datetime64(int(value), 's'))
+        return value
+
+    def card(self, label):
+        return Card(self, label)
+
+    def sync(self):
+        """把陣列寫回 DataFrame 的 meta 欄位，回傳 DataFrame (from_arrays 建立者此時才建 DataFrame)"""
+        if self.data is None:
+            self.data = pd.DataFrame(index=self.labels)
+        for col in META_DEFAULTS:
+            values = getattr(self, col)
+            if col in TIME_COLUMNS:
+                values = values.astype('datetime64[s]')
+            self.data[col] = values.copy()
+        return self.data
+
+    to_frame = sync
+
+
+class Card:
+    """
+    單題的輕量檢視 (取代 DataFrame.loc[i].copy())，以 question['Voc'] / question.get() 存取
+    meta 欄位直接讀 CardStore 陣列，文字欄位讀原 DataFrame；
+    overdue_days / is_burst / hint 為抽題時附加的欄位
+    """
+
+    __slots__ = ('store', 'name', 'pos', 'overdue_days', 'is_burst', 'hint')
+    EXTRA_FIELDS = ('overdue_days', 'is_burst', 'hint')
+
+    def __init__(self, store, label):
+        self.store = store
+        self.name = label
+        self.pos = store.pos(label)
+        self.overdue_days = 0
+        self.is_burst = False
+        self.hint = None
+
+    def __getitem__(self, key):
+        if key in Card.EXTRA_FIELDS:
+            return getattr(self, key)
+        if key in META_DEFAULTS:
+            return self.store.value(self.pos, key)
+        if key not in self.store.content.columns:
+            raise KeyError(key)
+        return self.store.text(self.pos, key)
+
+    def __setitem__(self, key, value):
+        if key not in Card.EXTRA_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"Card({self.name!r})"
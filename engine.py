@@ -0,0 +1,670 @@
+"""
+測驗引擎：抽題、評分、SM-2/AIMD 更新與統計，不含任何 input()/print()
+終端介面 (terminal.QuizApp) 只是建立在引擎上的一層前端；壓力測試與重播直接呼叫引擎 API：
+
+    engine = QuizEngine(5, data, storage=DeckStorage(), clock=ManualClock(start))
+    card = engine.next_card(["Voc", "Sentence", "translation", "Memorize"])
+    result = engine.submit_answer(card, "abstain", elapsed=1.2, answer_key="Voc")
+
+重播作答紀錄 (quiz.py --answer-log 產生) 並量測吞吐量：
+
+    python engine.py answers.jsonl --file voc.xlsx
+"""
+import argparse
+import json
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from cards import CardStore
+from instrumentation import Instrumentation, timing_enabled_from_env
+from matching import AnswerIndex, normalize_answer, typo_tolerance, edit_distance
+from rules import DEFAULT_AIMD, next_interval, answer_quality, answer_outcome
+from scheduler import (
+    ScheduleIndex, ProgressCounters, DeckStatistics, SessionPlan, NAT, DAY_SECONDS,
+    datetime_to_seconds, make_rng,
+)
+from schema import normalize_meta, TIME_FORMAT
+from storage import DeckStorage, ExcelStorage, SqliteStorage
+
+
+QUESTION_TYPES = {
+    "Root": ["Root", "meaning"],
+    "Voc": ["Voc", "Sentence", "translation", "Memorize"],
+}
+
+# submit_answer() 的結果；other_word 為 find_other_word() 的回傳值
+AnswerResult = namedtuple('AnswerResult', [
+    'card', 'answer_key', 'correct', 'timeout', 'mastered', 'quality', 'score_delta', 'other_word',
+])
+
+
+class ManualClock:
+    """可注入的時鐘：重播或測試時由呼叫端決定「現在」"""
+
+    def __init__(self, start=None):
+        self.now = start or datetime.now().replace(microsecond=0)
+
+    def __call__(self):
+        return self.now
+
+    def set(self, moment):
+        self.now = moment
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class AnswerLog:
+    """作答紀錄 (JSON lines)：記下每次送出的原始輸入，供重播重現排程問題"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def write(self, moment, result, text, elapsed):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        card = result.card
+        entry = {
+            'time': moment.strftime(TIME_FORMAT),
+            'card': int(card.name),
+            'answer_key': result.answer_key,
+            'text': text,
+            'elapsed': float(elapsed),
+            'timeout': bool(result.timeout),
+            'overdue_days': int(card['overdue_days']),
+            'burst': bool(card['is_burst']),
+        }
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_answer_log(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class QuizEngine:
+    """
+    測驗核心狀態與規則；所有「現在時間」都來自 self.clock，可換成 ManualClock
+    - next_card(required_columns): 依每日配額與 priority 抽下一題 (Card)，沒有題目時回傳 None
+    - submit_answer(card, text, elapsed, answer_key): 評分並更新排程，回傳 AnswerResult
+    - stats(): 統計數字
+    """
+
+    def __init__(self, time_limit, data, filename=None, seed=None, storage=None, clock=None, answer_log=None,
+                 content=None, answer_indexes=None, cards=None):
+        self.time_limit = time_limit
+        self.data = data
+        # 題目文字；多人共用同一份題庫時文字放在共用的 content，
+        # 個人的 meta 狀態由呼叫端建好 CardStore (CardStore.from_arrays) 以 cards 傳入，此時 data 為 None
+        self.content = data if content is None else content
+        self.filename = filename
+        self.clock = clock or datetime.now  # 回傳 datetime 的 callable
+        self.score = 0
+        self.answered_questions = 0
+        self.burst_mode = False  # 爆練模式開關
+        self.debug_priority = False  # 新增 debug flag
+        self.timing = Instrumentation(enabled=timing_enabled_from_env())  # 各階段耗時 (QUIZ_TIMING=1 開啟)
+        self.daily_max_quota = 150  # 正常模式每日最大題數限制
+        self.daily_new_quota = 50    # 每日最少新單字數量
+        self.aimd = DEFAULT_AIMD     # AIMD 常數 (見 rules.AimdParams)
+        self.rng = make_rng(seed)  # 抽題亂數來源，可指定 seed 重現結果
+        self._schedule_indexes = {}  # required_columns -> ScheduleIndex
+        self._progress = None  # ProgressCounters，首次使用時建立
+        self._statistics = None  # DeckStatistics，首次使用時建立
+        self._prefetched = {}  # required_columns -> 作答期間預先抽好的下一題
+        self._plans = {}  # required_columns -> 今日練習計畫 (SessionPlan)
+        self._prefetch_thread = None
+        self.answer_log = AnswerLog(answer_log) if answer_log else None
+        self.load_or_init_meta()
+        # answer_key -> AnswerIndex；只依題目文字而定，可由多個引擎共用同一個 dict
+        self._answer_indexes = answer_indexes if answer_indexes is not None else {}
+
+        # 儲存後端 (預設為 Excel + 作答日誌)：還原上次未寫回的作答
+        self.storage = storage if storage is not None else ExcelStorage(filename)
+        self.restored = self.storage.restore(self.data) if data is not None else 0
+        # 作答期間的 meta 狀態存在 NumPy 陣列，存檔時才寫回 self.data
+        self.cards = cards if cards is not None else CardStore(self.data, self.content)
+
+    def load_or_init_meta(self):
+        # 初始化負荷與配額追蹤欄位，時間欄位轉為 datetime64[s]、計數欄位轉為 int32
+        if self.data is not None:
+            normalize_meta(self.data)
+
+        # 資料重新整理後，排程索引與進度計數器需重建
+        self._schedule_indexes = {}
+        self._progress = None
+        self._statistics = None
+        self._prefetched = {}
+        self._plans = {}
+
+    def calculate_daily_progress(self):
+        """
+        計算每日新舊題分配與累積進度 (NumPy 累積和，不逐日模擬)
+        回傳 (每日進度欄位陣列 dict, 總天數)；已全部覆蓋時為 (None, 0)，配額無法完成覆蓋時總天數為 None
+        """
+        review_count = self.cards.review_count
+        new_questions_total = int((review_count == 0).sum())
+        old_questions_total = len(review_count) - new_questions_total
+        remaining_questions = new_questions_total
+        if remaining_questions <= 0:
+            return None, 0
+
+        # 新題也佔每日總題數，與 simulator.simulate_run 相同以 min(新題配額, 每日總題數) 為每日新題數
+        new_quota = max(min(self.daily_new_quota, self.daily_max_quota), 0)
+        max_quota = max(self.daily_max_quota, 0)
+        # 天數上限：新題配額用完前每天至少完成 new_quota 題；沒有新題配額時只能靠舊題額度
+        if new_quota > 0:
+            max_days = -(-new_questions_total // new_quota)
+        elif max_quota > 0 and old_questions_total >= remaining_questions:
+            max_days = -(-remaining_questions // max_quota)
+        else:
+            return None, None
+
+        days = np.arange(1, max_days + 1)
+        cum_new = np.minimum(days * new_quota, new_questions_total)
+        today_new = np.diff(cum_new, prepend=0)
+        cum_old = np.minimum(np.cumsum(np.maximum(max_quota - today_new, 0)), old_questions_total)
+        cum_done = cum_new + cum_old
+
+        total_days_needed = int(np.argmax(cum_done >= remaining_questions)) + 1
+        cum_new = cum_new[:total_days_needed].copy()
+        cum_old = cum_old[:total_days_needed].copy()
+
+        # 最後一天不超過剩餘題目，依比例分配新舊題
+        prev_new = int(cum_new[-2]) if total_days_needed > 1 else 0
+        prev_old = int(cum_old[-2]) if total_days_needed > 1 else 0
+        last_new, last_old = int(cum_new[-1]) - prev_new, int(cum_old[-1]) - prev_old
+        total_done_today = remaining_questions - (prev_new + prev_old)
+        if total_done_today < last_new + last_old:
+            scale = total_done_today / (last_new + last_old)
+            last_new = int(last_new * scale)
+            cum_new[-1] = prev_new + last_new
+            cum_old[-1] = prev_old + total_done_today - last_new
+
+        days = days[:total_days_needed]
+        daily_progress = {
+            "day": days,
+            "cum_new_done": cum_new,
+            "cum_old_done": cum_old,
+            "new_total": new_questions_total,
+            "old_total": old_questions_total,
+            "percent_done": (cum_new + cum_old) / remaining_questions,
+            "remaining_days_est": total_days_needed - days,
+        }
+        return daily_progress, total_days_needed
+
+    def get_progress_counters(self):
+        """取得進度計數器；首次使用或跨日時一次向量化重建，其餘只推進時間"""
+        now = datetime_to_seconds(self.clock())
+        if self._progress is None or self._progress.is_stale(now):
+            cards = self.cards
+            self._progress = ProgressCounters(
+                cards.next_review_date, cards.last_reviewed, cards.is_new(), cards.total_reviews, now,
+            )
+        else:
+            self._progress.advance(now)
+        return self._progress
+
+    def get_statistics(self):
+        """取得統計資料 (難度分佈、未來到期量)；首次使用或跨日時一次向量化重建"""
+        now = datetime_to_seconds(self.clock())
+        if self._statistics is None or self._statistics.is_stale(now):
+            cards = self.cards
+            self._statistics = DeckStatistics(cards.review_count, cards.total_reviews, cards.next_review_date, now)
+        return self._statistics
+
+    def get_daily_answered_count(self):
+        """今日已答題數；後端可直接查詢時 (SQLite) 以資料庫為準"""
+        count = self.storage.answered_count(self.clock().date())
+        if count is None:
+            return self.get_progress_counters().answered_today
+        return count
+
+    def get_schedule_index(self, required_columns):
+        """取得 (必要時建立) 該題型的排程索引，並推進到目前時間"""
+        key = tuple(required_columns)
+        now = datetime_to_seconds(self.clock())
+        index = self._schedule_indexes.get(key)
+        if index is None:
+            cards = self.cards
+            pos = np.flatnonzero(self.content[required_columns].notna().all(axis=1).to_numpy())
+            index = ScheduleIndex(
+                cards.labels,
+                pos,
+                cards.review_count[pos],
+                cards.next_review_date[pos],
+                cards.is_new(pos),
+                now,
+                rng=self.rng,
+            )
+            self._schedule_indexes[key] = index
+        else:
+            index.advance(now)
+        return index
+
+    def refresh_card(self, index):
+        """單題資料變動後，同步更新排程索引、進度計數器與統計資料"""
+        cards = self.cards
+        pos = cards.pos(index)
+        review_count = int(cards.review_count[pos])
+        last_reviewed = int(cards.last_reviewed[pos])
+        next_review = int(cards.next_review_date[pos])
+        is_new = review_count == 0 and last_reviewed == NAT
+        for schedule in self._schedule_indexes.values():
+            schedule.update(pos, review_count, next_review, is_new)
+        if self._progress is not None:
+            self._progress.update(pos, next_review, last_reviewed, is_new)
+        if self._statistics is not None:
+            self._statistics.update(pos, review_count, int(cards.total_reviews[pos]), next_review)
+
+    def draw_question(self, schedule, want_new):
+        """從排程索引抽出一題，回傳該題的 Card 檢視"""
+        if want_new:
+            return self.cards.card(schedule.draw_new())
+        if not schedule.has_old():
+            return None
+        chosen_index, overdue_days = schedule.draw_old()
+        chosen_row = self.cards.card(chosen_index)
+        chosen_row['overdue_days'] = overdue_days
+        return chosen_row
+
+    def format_hint(self, question, answer_key):
+        if answer_key == "Root":
+            return f"意思：{question['meaning']}"
+        return f"{question['Memorize']}\n翻譯：{question['translation']}"
+
+    def start_prefetch(self, required_columns, answer_key):
+        """使用者作答時，在背景先抽好同題型的下一題並排好提示"""
+        key = tuple(required_columns)
+        if key in self._prefetched or self._plans.get(key):
+            return  # 有計畫時取題只是從佇列取出，不必預取
+
+        def prefetch():
+            try:
+                schedule = self.get_schedule_index(required_columns)
+                # 預估本題作答後的配額狀態；取用時會再檢查一次
+                daily_answered = self.get_daily_answered_count() + 1
+                want_new = self.daily_max_quota - daily_answered > 0 and schedule.has_new()
+                chosen_row = self.draw_question(schedule, want_new)
+                if chosen_row is not None:
+                    chosen_row['hint'] = self.format_hint(chosen_row, answer_key)
+                    self._prefetched[key] = chosen_row
+            except Exception:
+                # 預取失敗不影響主流程，取題時會改為即時抽題
+                self._prefetched.pop(key, None)
+
+        self._prefetch_thread = threading.Thread(target=prefetch, daemon=True)
+        self._prefetch_thread.start()
+
+    def finish_prefetch(self):
+        """修改資料前必須先等預取執行緒結束"""
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join()
+            self._prefetch_thread = None
+
+    def invalidate_prefetch(self, index):
+        """剛作答的題目若正是預取的候選題，作廢該候選"""
+        for key, chosen_row in list(self._prefetched.items()):
+            if chosen_row.name == index:
+                del self._prefetched[key]
+
+    def take_prefetched_question(self, required_columns, schedule, want_new):
+        """取出預取的候選題；新舊題狀態已不符合本次抽題條件時作廢"""
+        self.finish_prefetch()
+        chosen_row = self._prefetched.pop(tuple(required_columns), None)
+        if chosen_row is None:
+            return None
+        state = schedule.card_state(chosen_row.pos)
+        if state is None or state[0] != want_new:
+            return None
+        if not want_new:
+            chosen_row['overdue_days'] = state[1]
+        return chosen_row
+
+    def calculate_next_review_date(self, last_interval, ef, quality, overdue_days):
+        """
+        AIMD 核心邏輯：
+        - 答對 → 間隔加性增長 + overdue 天數乘性調整
+        - 答錯 → 間隔乘性下降，回到短間隔
+        實際規則在 rules.next_interval，與模擬器及批次更新共用
+        """
+        new_interval, ef = next_interval(last_interval, ef, quality, overdue_days, self.aimd)
+        return int(new_interval), float(ef)
+
+    def get_answer_index(self, answer_key):
+        """該答案欄位的比對索引 (正規化答案、關鍵字)，每個欄位只建立一次"""
+        index = self._answer_indexes.get(answer_key)
+        if index is None:
+            index = self._answer_indexes[answer_key] = AnswerIndex(self.content[answer_key])
+        return index
+
+    def match_answer(self, user_input, question, answer_key):
+        """
+        作答的正確度分數：完全相同 1.0、拼字錯誤 0.7、含關鍵字 0.4、其他 0
+        輸入正好是題庫中另一個答案 (如 abrogate / abnegate) 時算錯，不當成拼字錯誤
+        正確答案使用索引中預先正規化的 key，不必每次重新處理
+        """
+        answers = self.get_answer_index(answer_key)
+        pos = self.cards.pos(question.name)
+        user_key, correct_key = normalize_answer(user_input), answers.keys[pos]
+        if user_key is None or correct_key is None:
+            return 0.0
+        if user_key == correct_key:
+            return 1.0
+        if answers.lookup(user_key):
+            return 0.0
+        tolerance = typo_tolerance(len(correct_key))
+        if edit_distance(user_key, correct_key, tolerance) <= tolerance:
+            return 0.7
+        if any(kw in user_key for kw in answers.keywords[pos]):
+            return 0.4
+        return 0.0
+
+    def find_other_word(self, user_input, question, answer_key):
+        """答錯時，輸入若是 (或只差一個字母就是) 題庫中的另一個答案，回傳 (該答案, 是否完全相同)"""
+        answers = self.get_answer_index(answer_key)
+        user_key = normalize_answer(user_input)
+        correct_key = answers.keys[self.cards.pos(question.name)]
+        if not user_key or user_key == correct_key:
+            return None
+        if answers.lookup(user_key):
+            return user_key, True
+        similar = [key for key in answers.similar(user_key) if key != correct_key]
+        if similar:
+            return similar[0], False
+        return None
+
+    def apply_reviews(self, card_ids, qualities, elapsed_times=None, timestamps=None, correct=None, burst=False):
+        """
+        批次套用多筆已評分的作答 (例如紙本測驗或 GUI 匯入)
+        - card_ids / qualities：題目索引與 1-5 的 SM-2 quality；有不在題庫中的索引時拋出 KeyError，不做任何更動
+        - elapsed_times：作答秒數，超過 time_limit 視為超時 (答錯)
+        - timestamps：作答時間，預設為現在
+        - correct：是否答對；未指定時以 quality >= 3 粗估。submit_answer 以正確度判斷 (match_answer >= 0.7)，
+          拼字錯誤又答得慢時 quality 只有 2 仍算答對，因此要與逐題 submit_answer 結果相同須傳入 correct 與 elapsed_times
+        同一題出現多次時依傳入順序分批處理，每一批內的題目不重複，整批以 NumPy 一次計算
+        回傳每筆作答更新後狀態的 DataFrame
+        """
+        card_ids = np.asarray(card_ids)
+        qualities = np.asarray(qualities, dtype=np.int64)
+        count = len(card_ids)
+        cards = self.cards
+        card_pos = cards.positions(card_ids)
+        if (card_pos < 0).any():
+            # 在更動任何狀態前整批拒絕，避免 -1 寫到最後一題、只套用一半又沒寫入日誌
+            raise KeyError(f"unknown card ids: {card_ids[card_pos < 0].tolist()}")
+        if timestamps is None:
+            timestamps = np.full(count, np.datetime64(self.clock(), 's'))
+        timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        correct = qualities >= 3 if correct is None else np.asarray(correct, dtype=bool)
+        if elapsed_times is not None:
+            correct = correct & (np.asarray(elapsed_times, dtype=float) <= self.time_limit)
+
+        overdue_days = np.zeros(count, dtype=np.int64)
+        results = {col: np.zeros(count, dtype=np.int64) for col in ('review_count', 'consecutive_correct', 'review_interval')}
+        results['ease_factor'] = np.zeros(count)
+        results['next_review_date'] = np.empty(count, dtype='datetime64[s]')
+
+        # 第 k 次出現的題目放在第 k 批
+        wave = pd.Series(card_pos).groupby(card_pos).cumcount().to_numpy()
+        for w in range(int(wave.max()) + 1 if count else 0):
+            pos = np.flatnonzero(wave == w)
+            slots = card_pos[pos]
+            review_count = cards.review_count[slots]
+            consecutive_correct = cards.consecutive_correct[slots]
+            next_review = cards.next_review_date[slots]
+            now = timestamps[pos].astype(np.int64)
+            due = (next_review != NAT) & (next_review <= now)
+            overdue_days[pos] = np.where(due, (now - next_review) // DAY_SECONDS, 0)
+
+            if not burst:
+                review_count, consecutive_correct, _ = answer_outcome(review_count, consecutive_correct, correct[pos])
+            new_interval, new_ef = next_interval(
+                cards.review_interval[slots], cards.ease_factor[slots], qualities[pos], overdue_days[pos], self.aimd,
+            )
+            next_review = now + new_interval * DAY_SECONDS
+
+            cards.review_count[slots] = review_count
+            cards.consecutive_correct[slots] = consecutive_correct
+            cards.review_interval[slots] = new_interval
+            cards.ease_factor[slots] = new_ef
+            cards.next_review_date[slots] = next_review
+            cards.last_reviewed[slots] = now
+            cards.total_reviews[slots] += 1
+
+            results['review_count'][pos] = review_count
+            results['consecutive_correct'][pos] = consecutive_correct
+            results['review_interval'][pos] = new_interval
+            results['ease_factor'][pos] = new_ef
+            results['next_review_date'][pos] = next_review.astype('datetime64[s]')
+
+        updated = pd.unique(card_ids)
+        for index in updated:
+            self.refresh_card(index)
+        if self._plans:
+            last_correct = pd.Series(correct, index=card_ids).groupby(level=0).last()
+            for plan in self._plans.values():
+                for index in updated:
+                    plan.answered(index, bool(last_correct[index]))
+        last_quality = pd.Series(qualities, index=card_ids).groupby(level=0).last()
+        self.storage.record_answers(cards, updated, last_quality.loc[updated].to_numpy())
+
+        return pd.DataFrame({
+            'card_id': card_ids,
+            'quality': qualities,
+            'correct': correct,
+            'overdue_days': overdue_days,
+            **results,
+        })
+
+    def plan_session(self, required_columns):
+        """
+        規劃今日練習：以目前的 priority 一次抽好剩餘配額的題目 (新題至多 daily_new_quota 扣掉今天已答過的新題)，
+        之後 next_card 直接從佇列取題；回傳 SessionPlan
+        """
+        schedule = self.get_schedule_index(required_columns)
+        quota = self.daily_max_quota
+        new_quota = self.daily_new_quota
+        if not self.burst_mode:
+            quota -= self.get_daily_answered_count()
+            new_quota -= self.get_progress_counters().new_answered_today
+        plan = SessionPlan(
+            schedule.labels, schedule.priority, schedule.is_new, quota, new_quota, rng=self.rng,
+        )
+        self._plans[tuple(required_columns)] = plan
+        self._prefetched.pop(tuple(required_columns), None)
+        return plan
+
+    def planned_count(self):
+        """所有練習計畫中尚未出題的題數"""
+        return sum(len(plan) for plan in self._plans.values())
+
+    def quota_reached(self):
+        return not self.burst_mode and self.get_daily_answered_count() >= self.daily_max_quota
+
+    def next_card(self, required_columns):
+        """根據每日配額與 priority 抽出下一題；達到每日配額或沒有題目時回傳 None"""
+        with self.timing.stage('select'):
+            return self._next_card(required_columns)
+
+    def _next_card(self, required_columns):
+        # 1. 取得該題型的排程索引 (新題池 + 舊題權重)
+        schedule = self.get_schedule_index(required_columns)
+
+        # 2. 檢查每日最大配額
+        if self.quota_reached():
+            return None
+        remaining_new_quota = max(0, self.daily_max_quota - self.get_daily_answered_count())
+
+        # 3. 有今日練習計畫時直接從佇列取題
+        plan = self._plans.get(tuple(required_columns))
+        if plan is not None:
+            label = plan.pop()
+            if label is not None:
+                card = self.cards.card(label)
+                card['overdue_days'] = schedule.card_state(card.pos)[1]
+                card['is_burst'] = self.burst_mode
+                return card
+            del self._plans[tuple(required_columns)]
+
+        # 4. 優先抽新題（每日新題配額），否則依 priority 權重抽舊題
+        want_new = remaining_new_quota > 0 and schedule.has_new()
+        card = self.take_prefetched_question(required_columns, schedule, want_new)
+        if card is None:
+            card = self.draw_question(schedule, want_new)
+        if card is not None:
+            card['is_burst'] = self.burst_mode
+        return card
+
+    def submit_answer(self, card, text, elapsed, answer_key, timeout=None):
+        """
+        評分並更新該題狀態 (錯誤次數、連續答對、SM-2 間隔與下次複習時間)
+        timeout 未指定時以 elapsed > time_limit 判斷；爆練模式抽出的題目不更新錯誤次數
+        """
+        if timeout is None:
+            timeout = elapsed > self.time_limit
+        index = card.name
+        cards = self.cards
+        pos = cards.pos(index)
+        now = self.clock()
+
+        with self.timing.stage('grade'):
+            accuracy = self.match_answer(text, card, answer_key)
+            correct = not timeout and accuracy >= 0.7
+            other_word = None if correct or timeout else self.find_other_word(text, card, answer_key)
+            quality = int(answer_quality(accuracy, elapsed, self.time_limit))
+
+        with self.timing.stage('schedule'):
+            mastered = False
+            if not card.get('is_burst', False):
+                cards.review_count[pos], cards.consecutive_correct[pos], mastered = answer_outcome(
+                    cards.review_count[pos], cards.consecutive_correct[pos], correct,
+                )
+            mastered = bool(mastered)
+            score_delta = 10 if correct else -5
+            self.score += score_delta
+            self.answered_questions += 1
+
+            new_interval, new_ef = self.calculate_next_review_date(
+                cards.review_interval[pos], cards.ease_factor[pos], quality, card.get('overdue_days', 0)
+            )
+            cards.review_interval[pos] = new_interval
+            cards.ease_factor[pos] = new_ef
+            now_seconds = datetime_to_seconds(now)
+            cards.next_review_date[pos] = now_seconds + new_interval * DAY_SECONDS
+            cards.last_reviewed[pos] = now_seconds
+            cards.total_reviews[pos] += 1
+            self.refresh_card(index)
+            for plan in self._plans.values():
+                plan.answered(index, correct)
+
+        with self.timing.stage('record'):
+            self.storage.record_answer(cards, index, quality)
+        result = AnswerResult(card, answer_key, correct, timeout, mastered, quality, score_delta, other_word)
+        if self.answer_log is not None:
+            self.answer_log.write(now, result, text, elapsed)
+        return result
+
+    def stats(self):
+        """
+        統計數字 (dict)；forecast 為今天起每天到期的題數 (今天含逾期)
+        後端可直接查詢時 (SQLite)，今日作答數與到期數由資料庫回答，並附上各題型的到期數 due_by_type
+        """
+        total = len(self.cards)
+        now = self.clock()
+        progress = self.get_progress_counters()
+        statistics = self.get_statistics()
+        simple, medium, hard = (int(count) for count in statistics.buckets)
+        due = self.storage.due_count([], now)
+        stats = {
+            'total': total,
+            'reviewed': statistics.reviewed_count,
+            'answered_today': self.get_daily_answered_count(),
+            'due': progress.due_count if due is None else due,
+            'new_remaining': progress.new_remaining,
+            'simple': simple,
+            'medium': medium,
+            'hard': hard,
+            'avg_error': statistics.error_total / total if total else 0.0,
+            'forecast': statistics.forecast.tolist(),
+            'score': self.score,
+            'answered_questions': self.answered_questions,
+        }
+        if due is not None:
+            stats['due_by_type'] = {
+                key: self.storage.due_count(columns, now) for key, columns in QUESTION_TYPES.items()
+            }
+        return stats
+
+    def save(self):
+        """把陣列狀態寫回 DataFrame 並交給儲存後端完整寫回"""
+        self.finish_prefetch()
+        with self.timing.stage('save'):
+            self.storage.save(self.cards.sync())
+            self.storage.close()
+        if self.answer_log is not None:
+            self.answer_log.close()
+
+
+def replay(engine, entries, clock):
+    """
+    依紀錄的時間、題目與輸入逐筆送進引擎 (不等待，盡量快)；clock 須為 engine 使用的 ManualClock
+    回傳 AnswerResult 串列
+    """
+    results = []
+    for entry in entries:
+        clock.set(datetime.strptime(entry['time'], TIME_FORMAT))
+        card = engine.cards.card(entry['card'])
+        card['overdue_days'] = entry.get('overdue_days', 0)
+        card['is_burst'] = entry.get('burst', False)
+        results.append(engine.submit_answer(
+            card, entry['text'], entry['elapsed'], entry['answer_key'], timeout=entry.get('timeout'),
+        ))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重播作答紀錄並量測引擎吞吐量 (不寫回題庫)")
+    parser.add_argument("log", help="quiz.py --answer-log 產生的作答紀錄")
+    parser.add_argument("--file", default="voc.xlsx", help="Excel 題庫檔 (預設 voc.xlsx)")
+    parser.add_argument("--db", help="改用 SQLite 題庫檔")
+    parser.add_argument("--time-limit", type=float, default=5)
+    parser.add_argument("--repeat", type=int, default=1, help="重複重播次數 (量測吞吐量用)")
+    args = parser.parse_args()
+
+    source = SqliteStorage(args.db) if args.db else ExcelStorage(args.file)
+    data = source.load()
+    source.restore(data)
+    source.close()
+    entries = read_answer_log(args.log)
+
+    elapsed = 0.0
+    for _ in range(args.repeat):
+        clock = ManualClock()
+        engine = QuizEngine(args.time_limit, data.copy(), storage=DeckStorage(), clock=clock)
+        start = time.perf_counter()
+        results = replay(engine, entries, clock)
+        elapsed += time.perf_counter() - start
+
+    total = len(entries) * args.repeat
+    correct = sum(result.correct for result in results)
+    print(f"重播 {total} 筆作答，耗時 {elapsed:.3f} 秒 ({total / max(elapsed, 1e-9):,.0f} 筆/秒)")
+    print(f"答對 {correct} / {len(results)}，最終分數 {engine.score}")
+    stats = engine.stats()
+    print(f"已複習題目: {stats['reviewed']}，簡單/中等/困難: {stats['simple']}/{stats['medium']}/{stats['hard']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+可選的效能量測：各階段 (啟動、抽題、評分、排程更新、寫入、顯示、存檔) 的耗時，
+每個階段保留最近 window 筆樣本作為滾動直方圖。關閉時 stage() 只回傳共用的空 context，幾乎沒有成本。
+
+    QUIZ_TIMING=1 python quiz.py                     # 或在選單按 p 切換
+    python quiz.py --timing-dump timing.csv         # 結束時輸出 JSON/CSV (依副檔名)
+    python quiz.py --profile quiz.prof              # 整個 session 包在 cProfile 裡
+"""
+import contextlib
+import cProfile
+import csv
+import json
+import os
+import time
+from array import array
+
+
+BUCKETS_MS = [0.1, 1, 10, 100]  # 直方圖分界 (毫秒)
+BUCKET_LABELS = ['<0.1ms', '<1ms', '<10ms', '<100ms', '>=100ms']
+SUMMARY_FIELDS = ['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'] + BUCKET_LABELS
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def timing_enabled_from_env():
+    return os.environ.get('QUIZ_TIMING', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class StageStats:
+    """單一階段的累計次數與最近 window 筆耗時 (環狀緩衝區)"""
+
+    __slots__ = ('samples', 'count', 'total')
+
+    def __init__(self, window):
+        self.samples = array('d', bytes(8 * window))
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.total += seconds
+
+    def recent(self):
+        return self.samples[:min(self.count, len(self.samples))]
+
+
+class _Timer:
+    __slots__ = ('stats', 'start')
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats.add(time.perf_counter() - self.start)
+
+
+class Instrumentation:
+    def __init__(self, enabled=False, window=1000):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}  # 階段名稱 -> StageStats
+
+    def stage(self, name):
+        """with timing.stage('select'): ... 量測一段程式的耗時"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Timer(self._stats(name))
+
+    def record(self, name, seconds):
+        """加入一筆在別處量到的耗時 (例如啟動到第一個提示)"""
+        if self.enabled:
+            self._stats(name).add(seconds)
+
+    def _stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(self.window)
+        return stats
+
+    def reset(self):
+        self.stages = {}
+
+    def summary(self):
+        """每個階段一列：累計次數、平均與最近樣本的百分位數 (毫秒) 及直方圖"""
+        import numpy as np  # 只在輸出摘要時才需要；quiz.py 啟動時不載入 NumPy
+
+        rows = []
+        for name, stats in self.stages.items():
+            recent = np.asarray(stats.recent()) * 1000
+            p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+            buckets = np.bincount(np.searchsorted(BUCKETS_MS, recent, side='right'), minlength=len(BUCKET_LABELS))
+            row = {
+                'stage': name,
+                'count': stats.count,
+                'mean_ms': stats.total / stats.count * 1000,
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(recent.max()),
+            }
+            row.update(zip(BUCKET_LABELS, (int(count) for count in buckets)))
+            rows.append(row)
+        return rows
+
+    def format_summary(self):
+        lines = [f"{'階段':<10} {'次數':>6} {'平均ms':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  直方圖 (最近樣本)"]
+        for row in self.summary():
+            histogram = ' '.join(f"{label}:{row[label]}" for label in BUCKET_LABELS if row[label])
+            lines.append(f"{row['stage']:<10} {row['count']:>6} {row['mean_ms']:>8.3f} {row['p50_ms']:>8.3f} "
+                         f"{row['p95_ms']:>8.3f} {row['p99_ms']:>8.3f} {row['max_ms']:>8.3f}  {histogram}")
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        """輸出成 JSON 或 CSV (依副檔名)"""
+        rows = self.summary()
+        if path.lower().endswith('.csv'):
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+def run_profiled(path, func, *args, **kwargs):
+    """在 cProfile 中執行 func，結束 (包含例外) 後把統計寫入 path，可用 pstats / snakeviz 讀取"""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
@@ -0,0 +1,99 @@
+import numpy as np
+
+
+def normalize_answer(text):
+    """比對用的答案 key：忽略大小寫與前後空白；非字串 (空值) 為 None"""
+    if not isinstance(text, str):
+        return None
+    return text.strip().lower()
+
+
+def typo_tolerance(length):
+    """可容許的拼字錯誤數：短字不容錯，長字最多 2 個"""
+    if length <= 3:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+def edit_distance(a, b, max_distance=None):
+    """
+    Damerau (OSA) 編輯距離，相鄰字母對調算一次錯誤
+    指定 max_distance 時只計算對角線附近的帶狀區域，整列超過上限即提早結束，
+    回傳 max_distance + 1 代表「超過上限」
+    """
+    if a == b:
+        return 0
+    if max_distance is None:
+        max_distance = max(len(a), len(b))
+    limit = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return limit
+    if len(a) > len(b):
+        a, b = b, a
+
+    inf = limit
+    prev_prev = None
+    prev = [j if j <= max_distance else inf for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        lo = max(1, i - max_distance)
+        hi = min(len(b), i + max_distance)
+        row = [inf] * (len(b) + 1)
+        row[0] = i if i <= max_distance else inf
+        row_min = row[0]
+        ca = a[i - 1]
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            value = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if (prev_prev is not None and i > 1 and j > 1
+                    and ca == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, prev_prev[j - 2] + 1)
+            row[j] = min(value, inf)
+            row_min = min(row_min, row[j])
+        if row_min > max_distance:
+            return limit
+        prev_prev, prev = prev, row
+    return min(prev[len(b)], limit)
+
+
+def deletions(key):
+    """key 本身與刪掉任一個字母後的所有字串"""
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+class AnswerIndex:
+    """
+    單一答案欄位 (Voc / Root) 的比對索引，載入後只建立一次：
+    - keys / keywords：每題正規化後的答案與部分比對用關鍵字，依 CardStore 位置排列
+    - lookup()：輸入是否正好是題庫中某些題目的答案 (dict 查詢)
+    - similar()：只差一個字母的其他答案；以「刪一個字母」的鄰域建索引 (第一次使用時才建立)，
+      查詢只需 len(key) + 1 次 dict 查詢，不必掃過整份題庫
+    """
+
+    def __init__(self, answers):
+        self.keys = np.array([normalize_answer(answer) for answer in answers], dtype=object)
+        self.keywords = [tuple(key.split()) if key else () for key in self.keys]
+        self.by_key = {}
+        for pos, key in enumerate(self.keys):
+            if key:
+                self.by_key.setdefault(key, []).append(pos)
+        self._neighbors = None
+
+    def lookup(self, key):
+        return self.by_key.get(key, [])
+
+    def similar(self, key):
+        """編輯距離 1 以內 (含相鄰字母對調) 的其他答案"""
+        if self._neighbors is None:
+            neighbors = {}
+            for answer in self.by_key:
+                for variant in deletions(answer):
+                    neighbors.setdefault(variant, []).append(answer)
+            self._neighbors = neighbors
+        found = set()
+        for variant in deletions(key):
+            for answer in self._neighbors.get(variant, ()):
+                if answer != key and edit_distance(key, answer, 1) <= 1:
+                    found.add(answer)
+        return sorted(found)
@@ -0,0 +1,123 @@
+"""
+終端選單與統計摘要；只用標準函式庫，題庫還在背景載入時 quiz.py 就能先顯示選單。
+統計摘要在每次存檔時寫入 voc.xlsx.summary.json，選單 3 在題庫載入完成前直接讀這個檔。
+"""
+import json
+import os
+from datetime import datetime
+
+
+SUMMARY_VERSION = 1
+SUMMARY_SUFFIX = '.summary.json'
+MENU_CHOICES = "1/2/3/4/d/s/c/p/q"
+FORECAST_DAYS = 7  # 未來複習量逐日列出的天數
+
+
+def print_menu(burst_mode=False, timing_enabled=False, planned=0):
+    print("\n請選擇下一步操作：")
+    print("1: 提問 Root 問題")
+    print("2: 提問 Voc 問題")
+    print("3: 顯示統計資料")
+    print(f"4: 切換爆練模式 (目前：{'開啟' if burst_mode else '關閉'})")
+    print(f"d: 規劃今日練習 (一次抽好整批題目{f'，計畫剩 {planned} 題' if planned else ''})")
+    print("s: 模擬每日覆蓋率 (動畫版)")
+    print("c: 設定每日題數與新單字配額")
+    print(f"p: 切換效能量測 (目前：{'開啟' if timing_enabled else '關閉'})")
+    print("q: 退出測試")
+
+
+def print_statistics(stats):
+    """stats 為 QuizEngine.stats() 的 dict"""
+    print(f"\n=== 學習統計 ===")
+    total_questions = stats['total']
+    reviewed_questions = stats['reviewed']
+
+    print(f"總題目數: {total_questions}")
+    print(f"已複習題目 (不同題目數): {reviewed_questions}")
+    print(f"複習進度: {reviewed_questions / total_questions * 100 if total_questions else 0:.1f}%")
+    print(f"今日練習題數: {stats['answered_today']}")
+    if stats.get('due_by_type'):
+        due = '、'.join(f"{key} {count} 題" for key, count in stats['due_by_type'].items())
+        print(f"待複習題數 (依題型): {due}")
+
+    print(f"\n難度分佈 (基於錯誤次數):")
+    print(f"  簡單 (已掌握): {stats['simple']} 題")
+    print(f"  中等 (1-2次錯誤): {stats['medium']} 題")
+    print(f"  困難 (>=3次錯誤): {stats['hard']} 題")
+
+    if stats.get('forecast'):
+        print_forecast(stats['forecast'])
+
+
+def print_forecast(forecast):
+    """forecast[d] 為 d 天後到期的題數 (今天含逾期)"""
+    print(f"\n未來複習量 (依下次複習日期):")
+    peak = max(forecast[:FORECAST_DAYS]) or 1
+    for day, count in enumerate(forecast[:FORECAST_DAYS]):
+        label = "今天(含逾期)" if day == 0 else "明天" if day == 1 else f"{day} 天後"
+        print(f"  {label:<8} {count:>6} 題 {'█' * round(20 * count / peak)}")
+    for days in (30, 90):
+        if len(forecast) >= days:
+            total = sum(forecast[:days])
+            print(f"  未來 {days} 天: {total} 題 (平均每天 {total / days:.1f} 題，最多 {max(forecast[:days])} 題)")
+
+
+def summary_path(filename):
+    return filename + SUMMARY_SUFFIX
+
+
+def _deck_files(filename):
+    """決定摘要是否過期的檔案：題庫本身與 Excel 的作答日誌"""
+    return [filename, filename + '.journal']
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if st.st_size == 0 and path.endswith('.journal'):
+        return None  # 空日誌與沒有日誌相同
+    return [st.st_size, st.st_mtime_ns]
+
+
+def write_summary(filename, stats, now=None):
+    """存檔後呼叫：記下統計數字與當下題庫檔的大小/mtime"""
+    now = now or datetime.now()
+    payload = {
+        'version': SUMMARY_VERSION,
+        'saved_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+        'files': [_stat_key(path) for path in _deck_files(filename)],
+        'stats': {key: value for key, value in stats.items() if key not in ('score', 'answered_questions')},
+    }
+    path = summary_path(filename)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_summary(filename, now=None):
+    """
+    回傳 (stats, saved_at)；檔案不存在、格式不符，或題庫在存檔後被改過
+    (用 Excel 編輯、當機留下未寫回的作答) 時回傳 None
+    """
+    try:
+        with open(summary_path(filename), encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get('version') != SUMMARY_VERSION:
+        return None
+    if payload.get('files') != [_stat_key(path) for path in _deck_files(filename)]:
+        return None
+    stats = payload['stats']
+    saved_at = datetime.strptime(payload['saved_at'], '%Y-%m-%d %H:%M:%S')
+    shift = ((now or datetime.now()).date() - saved_at.date()).days
+    if shift > 0:
+        stats['answered_today'] = 0  # 存檔之後沒有再作答過
+        forecast = stats.get('forecast')
+        if forecast:
+            # 存檔後過了幾天：之前的到期量都併入今天 (逾期)
+            stats['forecast'] = [sum(forecast[:shift + 1])] + forecast[shift + 1:]
+    return stats, saved_at
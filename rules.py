@@ -0,0 +1,68 @@
+from collections import namedtuple
+import numpy as np
+
+
+MASTERED_STREAK = 3  # 連續答對幾次視為已掌握，錯誤次數歸零
+
+# AIMD 可調常數；預設值即原本寫死在 calculate_next_review_date 的數字
+AimdParams = namedtuple('AimdParams', [
+    'additive_growth',   # 答對時間隔加性增長天數
+    'decrease_factor',   # 答錯時間隔乘上的比例 (0.5 = 減半)
+    'overdue_bonus',     # 每逾期一天，增長量額外放大的比例
+    'ef_up',             # 答對時 EF 提升量
+    'ef_down',           # 答錯時 EF 下降量
+    'ef_min',            # EF 下限
+])
+DEFAULT_AIMD = AimdParams(
+    additive_growth=1,
+    decrease_factor=0.5,
+    overdue_bonus=0.1,
+    ef_up=0.02,
+    ef_down=0.1,
+    ef_min=1.3,
+)
+
+
+def next_interval(last_interval, ef, quality, overdue_days, params=DEFAULT_AIMD):
+    """
+    AIMD 核心邏輯 (純量或 NumPy 陣列皆可)：
+    - 答對 → 間隔加性增長 + overdue 天數乘性調整
+    - 答錯 → 間隔乘性下降，回到短間隔
+    """
+    last_interval = np.asarray(last_interval)
+    ef = np.asarray(ef, dtype=float)
+    wrong = np.asarray(quality) < 3  # 答錯或部分正確
+
+    new_ef = np.where(wrong, np.maximum(params.ef_min, ef - params.ef_down), ef + params.ef_up)
+    shrunk = np.maximum(1, np.floor(last_interval * params.decrease_factor))  # Interval 乘性下降
+    overdue_bonus = 1 + params.overdue_bonus * np.asarray(overdue_days)
+    grown = np.round(last_interval + params.additive_growth * overdue_bonus)
+    new_interval = np.where(wrong, shrunk, grown).astype(np.int64)
+    return new_interval, new_ef
+
+
+def answer_quality(accuracy_score, elapsed_time, time_limit, penalty_rate=0.5):
+    """正確度分數乘上作答時間懲罰，換算成 1-5 的 SM-2 quality"""
+    time_ratio = np.asarray(elapsed_time, dtype=float) / max(time_limit, 0.1)
+    time_penalty = np.maximum(0.5, 1 - time_ratio * penalty_rate)
+    raw_quality = np.asarray(accuracy_score, dtype=float) * time_penalty * 5
+    return np.maximum(1, np.round(raw_quality)).astype(np.int64)  # 強制下限 1 分
+
+
+def answer_outcome(review_count, consecutive_correct, correct):
+    """
+    作答結果對錯誤次數與連續答對次數的影響：
+    - 答錯或超時 → 錯誤次數 +1，連續答對歸零
+    - 答對 → 連續答對 +1，達 MASTERED_STREAK 次時兩者皆歸零
+    回傳 (review_count, consecutive_correct, mastered)
+    """
+    review_count = np.asarray(review_count)
+    consecutive_correct = np.asarray(consecutive_correct)
+    correct = np.asarray(correct, dtype=bool)
+
+    streak = np.where(correct, consecutive_correct + 1, 0)
+    mastered = correct & (streak >= MASTERED_STREAK)
+    new_review_count = np.where(correct, review_count, review_count + 1)
+    new_review_count = np.where(mastered, 0, new_review_count)
+    streak = np.where(mastered, 0, streak)
+    return new_review_count, streak, mastered
@@ -0,0 +1,476 @@
+import heapq
+from collections import deque
+import numpy as np
+
+
+DAY_SECONDS = 86400
+NAT = np.iinfo(np.int64).min  # 尚未排程 (NaT) 的 epoch 秒數哨兵值
+SLOT_BITS = 24  # heap 項目把 (時間, slot) 編成單一整數 時間 << SLOT_BITS | slot，比 tuple 省記憶體
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+def calculate_priority(review_count, overdue_days, is_new):
+    """抽題權重：錯誤次數、逾期天數與新題加權 (純量或陣列皆可)"""
+    return (review_count * 80) + (overdue_days * 20) + (is_new * 50)
+
+
+def datetime_to_seconds(moment):
+    return int(np.datetime64(moment, 's').astype(np.int64))
+
+
+def heap_entries(times, slots):
+    """(時間, slot) 陣列編成 heap 項目 (Python int 清單)；slot 須小於 2 ** SLOT_BITS"""
+    return ((np.asarray(times, dtype=np.int64) << SLOT_BITS) | np.asarray(slots, dtype=np.int64)).tolist()
+
+
+def make_rng(seed=None):
+    """接受 seed 或既有 Generator，方便測試與 benchmark 重現抽題結果"""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def weighted_sample(weights, k, rng=None):
+    """
+    一次抽出 k 個不重複的位置 (Efraimidis-Spirakis: 取 log(u)/w 最大的 k 個)
+    正權重不足 k 個時，其餘名額在權重為 0 的項目中均勻抽取
+    """
+    rng = make_rng(rng)
+    weights = np.asarray(weights, dtype=float)
+    k = min(int(k), len(weights))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    positive = np.flatnonzero(weights > 0)
+    keys = np.log(rng.random(len(positive))) / weights[positive]
+    if len(positive) > k:
+        top = np.argpartition(-keys, k - 1)[:k]
+        chosen = positive[top[np.argsort(-keys[top])]]
+    else:
+        chosen = positive[np.argsort(-keys)]
+    if len(chosen) < k:
+        zeros = np.flatnonzero(weights <= 0)
+        chosen = np.concatenate((chosen, rng.choice(zeros, k - len(chosen), replace=False)))
+    return chosen
+
+
+class PrioritySampler:
+    """
+    以 Fenwick tree 維護權重的加權抽樣器：
+    - update(): 單點更新 O(log N)
+    - draw(): 依權重抽樣 O(log N)
+    - 所有啟用項目權重皆為 0 時，改為在啟用項目中均勻抽樣
+    """
+
+    def __init__(self, weights, active=None, rng=None):
+        self.size = len(weights)
+        self.weights = np.asarray(weights, dtype=float).copy()
+        if active is None:
+            active = np.ones(self.size, dtype=bool)
+        self.active = np.asarray(active, dtype=bool).copy()
+        self.weights[~self.active] = 0.0
+        self.rng = make_rng(rng)
+        self._top = 1 << max(self.size.bit_length() - 1, 0)
+        self._rebuild()
+
+    @staticmethod
+    def _build_tree(values):
+        # tree[i] = values[i - lowbit(i) + 1 .. i] 的總和，以前綴和一次算出
+        prefix = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+        positions = np.arange(1, len(values) + 1)
+        tree = np.zeros(len(values) + 1)
+        tree[1:] = prefix[positions] - prefix[positions - (positions & -positions)]
+        return tree
+
+    def _rebuild(self):
+        self._weight_tree = self._build_tree(self.weights)
+        self._count_tree = self._build_tree(self.active.astype(float))
+        self.active_count = int(self.active.sum())
+
+    @staticmethod
+    def _add(tree, slot, delta):
+        i = slot + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    @staticmethod
+    def _prefix(tree, slot):
+        total = 0.0
+        i = slot
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _search(self, tree, target):
+        """找出前綴和首次 >= target 的位置"""
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] < target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return min(pos, self.size - 1)
+
+    def __len__(self):
+        return self.active_count
+
+    def total(self):
+        return self._prefix(self._weight_tree, self.size)
+
+    def update(self, slot, weight, active=True):
+        weight = float(weight) if active else 0.0
+        delta = weight - self.weights[slot]
+        if delta:
+            self.weights[slot] = weight
+            self._add(self._weight_tree, slot, delta)
+        if bool(active) != self.active[slot]:
+            self.active[slot] = active
+            self._add(self._count_tree, slot, 1.0 if active else -1.0)
+            self.active_count += 1 if active else -1
+
+    def draw(self):
+        """回傳抽中的 slot；沒有任何啟用項目時回傳 None"""
+        if self.active_count == 0:
+            return None
+        total = self.total()
+        if total > 1e-9:
+            slot = self._search(self._weight_tree, (1.0 - self.rng.random()) * total)
+            if self.weights[slot] > 0:
+                return slot
+            # 浮點誤差累積導致落在 0 權重項目時，重建後再抽一次
+            self._rebuild()
+            if self.total() > 1e-9:
+                return self._search(self._weight_tree, (1.0 - self.rng.random()) * self.total())
+        # 全部權重為 0：均勻抽樣
+        target = self.rng.integers(self.active_count) + 1
+        return self._search(self._count_tree, target - 0.5)
+
+
+class ScheduleIndex:
+    """
+    單一題型 (required_columns) 的排程索引：
+    - 新題池：可 O(1) 隨機抽取與移除
+    - 舊題：維護每題 priority，逾期天數由 heap 依到期門檻逐日推進
+    由 QuizApp 在每次作答後原地更新，不需再掃描整個 DataFrame
+    labels 為整份題庫的 Index (多人共用)，positions 為此題型的題目在題庫中的位置；
+    update / card_state 以題庫位置查詢，不另外建 label -> slot 的 dict
+    heap 項目過期與否由 pending (每題目前有效的門檻) 判斷，不必在項目裡存版本號
+    """
+
+    def __init__(self, labels, positions, review_count, next_review, is_new, now, rng=None):
+        self.rng = make_rng(rng)
+        self.deck_labels = labels
+        self.positions = np.asarray(positions, dtype=np.int32)
+        size = len(self.positions)
+        self.slot_of = np.full(len(labels), -1, dtype=np.int32)  # 題庫位置 -> slot，不屬於此題型為 -1
+        self.slot_of[self.positions] = np.arange(size, dtype=np.int32)
+        self.review_count = np.asarray(review_count, dtype=np.int32).copy()
+        self.next_review = np.asarray(next_review, dtype=np.int64).copy()
+        self.is_new = np.asarray(is_new, dtype=bool).copy()
+        self.now = now
+
+        # 新題池：_new_pool[:_new_count] 為新題 slot，_new_pos 為 slot 在池中的位置 (-1 為不在池中)
+        new_slots = np.flatnonzero(self.is_new)
+        self._new_pool = np.empty(size, dtype=np.int32)
+        self._new_pool[:len(new_slots)] = new_slots
+        self._new_count = len(new_slots)
+        self._new_pos = np.full(size, -1, dtype=np.int32)
+        self._new_pos[new_slots] = np.arange(len(new_slots), dtype=np.int32)
+
+        # 逾期天數與 priority 一次向量化算好
+        has_date = self.next_review != NAT
+        due = has_date & (self.next_review <= now)
+        self.overdue_days = np.zeros(size, dtype=np.int32)
+        self.overdue_days[due] = (now - self.next_review[due]) // DAY_SECONDS
+        priority = np.where(self.is_new, 0, calculate_priority(self.review_count, self.overdue_days, 0))
+        self.sampler = PrioritySampler(priority, active=~self.is_new, rng=self.rng)
+
+        # 下一次逾期天數 +1 的時間點
+        tracked = np.flatnonzero(~self.is_new & has_date)
+        thresholds = self.next_review[tracked] + (self.overdue_days[tracked].astype(np.int64) + 1) * DAY_SECONDS
+        self.pending = np.full(size, NAT, dtype=np.int64)
+        self.pending[tracked] = thresholds
+        self._heap = heap_entries(thresholds, tracked)
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def labels(self):
+        """此題型各 slot 的題目索引"""
+        return self.deck_labels[self.positions]
+
+    @property
+    def priority(self):
+        """每個 slot 的 priority (新題為 0)，即抽樣器的權重"""
+        return self.sampler.weights
+
+    def _add_new(self, slot):
+        if self._new_pos[slot] < 0:
+            self._new_pos[slot] = self._new_count
+            self._new_pool[self._new_count] = slot
+            self._new_count += 1
+
+    def _remove_new(self, slot):
+        pos = self._new_pos[slot]
+        if pos < 0:
+            return
+        self._new_pos[slot] = -1
+        self._new_count -= 1
+        last = self._new_pool[self._new_count]
+        if last != slot:
+            self._new_pool[pos] = last
+            self._new_pos[last] = pos
+
+    def _schedule(self, slot):
+        """依目前時間重算單題逾期天數與 priority，並推入下一個門檻"""
+        next_review = self.next_review[slot]
+        if self.is_new[slot]:
+            self.overdue_days[slot] = 0
+            self.sampler.update(slot, 0, active=False)
+            return
+        overdue = 0
+        if next_review != NAT and next_review <= self.now:
+            overdue = (self.now - next_review) // DAY_SECONDS
+        self.overdue_days[slot] = overdue
+        self.sampler.update(slot, calculate_priority(self.review_count[slot], overdue, 0))
+        if next_review != NAT:
+            threshold = int(next_review + (overdue + 1) * DAY_SECONDS)
+            self.pending[slot] = threshold
+            heapq.heappush(self._heap, threshold << SLOT_BITS | int(slot))
+
+    def advance(self, now):
+        """時間前進：只處理跨過逾期門檻的題目"""
+        self.now = max(self.now, now)
+        while self._heap and self._heap[0] >> SLOT_BITS <= self.now:
+            entry = heapq.heappop(self._heap)
+            slot = entry & SLOT_MASK
+            if self.pending[slot] == entry >> SLOT_BITS:
+                self.pending[slot] = NAT
+                self._schedule(slot)
+
+    def update(self, pos, review_count, next_review, is_new):
+        """作答後原地更新單題狀態；pos 為題目在題庫中的位置"""
+        slot = self.slot_of[pos]
+        if slot < 0:
+            return
+        self.pending[slot] = NAT  # heap 中舊的門檻作廢
+        self.review_count[slot] = review_count
+        self.next_review[slot] = next_review
+        self.is_new[slot] = is_new
+        if is_new:
+            self._add_new(slot)
+        else:
+            self._remove_new(slot)
+        self._schedule(slot)
+
+    def card_state(self, pos):
+        """回傳 (is_new, overdue_days)；不屬於此題型時回傳 None"""
+        slot = self.slot_of[pos]
+        if slot < 0:
+            return None
+        return bool(self.is_new[slot]), int(self.overdue_days[slot])
+
+    def has_new(self):
+        return self._new_count > 0
+
+    def has_old(self):
+        return len(self.sampler) > 0
+
+    def draw_new(self):
+        slot = self._new_pool[self.rng.integers(self._new_count)]
+        return self.deck_labels[self.positions[slot]]
+
+    def draw_old(self):
+        """依 priority 權重抽出一題舊題，回傳 (label, overdue_days)"""
+        slot = self.sampler.draw()
+        if slot is None:
+            return None, 0
+        return self.deck_labels[self.positions[slot]], int(self.overdue_days[slot])
+
+
+class ProgressCounters:
+    """
+    進度計數器：待複習數、今日已答數、今日已答新題數、剩餘新題數
+    - 啟動或跨日時以一次向量化計算重建；今日已答新題數此時以「今天答過且總作答次數為 1」估計
+    - 作答後 O(1) 調整；尚未到期的題目放在 heap，時間跨過到期點時才計入待複習
+    陣列依題庫位置排列，update 直接以位置更新
+    """
+
+    def __init__(self, next_review, last_reviewed, is_new, total_reviews, now):
+        self.next_review = np.asarray(next_review, dtype=np.int64).copy()
+        self.is_new = np.asarray(is_new, dtype=bool).copy()
+        self.now = now
+        self.day_start = now - now % DAY_SECONDS
+
+        last_reviewed = np.asarray(last_reviewed, dtype=np.int64)
+        self.reviewed_today = (last_reviewed != NAT) & (last_reviewed >= self.day_start)
+        due = (self.next_review == NAT) | (self.next_review <= now)
+        self.due_count = int(due.sum())
+        self.answered_today = int(self.reviewed_today.sum())
+        first_review = np.asarray(total_reviews) == 1
+        self.new_answered_today = int((self.reviewed_today & ~self.is_new & first_review).sum())
+        self.new_remaining = int(self.is_new.sum())
+
+        pending = np.flatnonzero(~due)
+        self.pending = np.where(due, NAT, self.next_review)  # heap 中有效項目的到期時間
+        self._heap = heap_entries(self.next_review[pending], pending)
+        heapq.heapify(self._heap)
+
+    def is_stale(self, now):
+        """跨日後需要重建"""
+        return now - now % DAY_SECONDS != self.day_start
+
+    def _is_due(self, pos):
+        next_review = self.next_review[pos]
+        return next_review == NAT or next_review <= self.now
+
+    def advance(self, now):
+        self.now = max(self.now, now)
+        while self._heap and self._heap[0] >> SLOT_BITS <= self.now:
+            entry = heapq.heappop(self._heap)
+            pos = entry & SLOT_MASK
+            if self.pending[pos] == entry >> SLOT_BITS:
+                self.pending[pos] = NAT
+                self.due_count += 1
+
+    def update(self, pos, next_review, last_reviewed, is_new):
+        """作答後調整單題對計數器的貢獻；pos 為題目在題庫中的位置"""
+        if self._is_due(pos):
+            self.due_count -= 1
+        self.pending[pos] = NAT
+        self.next_review[pos] = next_review
+        if self._is_due(pos):
+            self.due_count += 1
+        else:
+            self.pending[pos] = next_review
+            heapq.heappush(self._heap, int(next_review) << SLOT_BITS | int(pos))
+
+        reviewed_today = last_reviewed != NAT and last_reviewed >= self.day_start
+        if reviewed_today != self.reviewed_today[pos]:
+            self.reviewed_today[pos] = reviewed_today
+            self.answered_today += 1 if reviewed_today else -1
+        if is_new != self.is_new[pos]:
+            if reviewed_today:
+                self.new_answered_today += -1 if is_new else 1
+            self.is_new[pos] = is_new
+            self.new_remaining += 1 if is_new else -1
+
+
+def difficulty_bucket(review_count):
+    """難度分級：0 = 簡單 (沒有錯誤)、1 = 中等 (1-2 次錯誤)、2 = 困難 (>= 3 次)；純量或陣列皆可"""
+    return np.minimum((np.asarray(review_count) + 1) // 2, 2)
+
+
+class DeckStatistics:
+    """
+    統計資料：難度分佈、已複習題數、錯誤次數總和，以及未來 horizon 天每天到期的題數
+    - 啟動或跨日時以一次向量化計算重建
+    - 作答後 O(1) 調整，選單 3 不必掃過整份題庫
+    forecast[0] 為今天到期 (含逾期) 的題數；從未排程的新題不計入
+    陣列依題庫位置排列，update 直接以位置更新
+    """
+
+    def __init__(self, review_count, total_reviews, next_review, now, horizon=90):
+        self.review_count = np.asarray(review_count, dtype=np.int32).copy()
+        self.reviewed = np.asarray(total_reviews) > 0
+        self.next_review = np.asarray(next_review, dtype=np.int64).copy()
+        self.horizon = horizon
+        self.day_start = now - now % DAY_SECONDS
+
+        self.buckets = np.bincount(difficulty_bucket(self.review_count), minlength=3)
+        self.reviewed_count = int(self.reviewed.sum())
+        self.error_total = int(self.review_count.sum())
+        scheduled = self.next_review[self.next_review != NAT]
+        days = np.maximum((scheduled - self.day_start) // DAY_SECONDS, 0)
+        self.forecast = np.bincount(days[days < horizon], minlength=horizon)
+
+    def is_stale(self, now):
+        """跨日後需要重建"""
+        return now - now % DAY_SECONDS != self.day_start
+
+    def _day(self, next_review):
+        """到期日相對今天的天數 (逾期算今天)；未排程或超出 horizon 為 -1"""
+        if next_review == NAT:
+            return -1
+        day = max((next_review - self.day_start) // DAY_SECONDS, 0)
+        return day if day < self.horizon else -1
+
+    def update(self, slot, review_count, total_reviews, next_review):
+        """作答後調整單題對統計的貢獻；slot 為題目在題庫中的位置"""
+        old_count = int(self.review_count[slot])
+        self.buckets[difficulty_bucket(old_count)] -= 1
+        self.buckets[difficulty_bucket(review_count)] += 1
+        self.error_total += review_count - old_count
+        self.review_count[slot] = review_count
+
+        reviewed = total_reviews > 0
+        if reviewed != self.reviewed[slot]:
+            self.reviewed[slot] = reviewed
+            self.reviewed_count += 1 if reviewed else -1
+
+        old_day = self._day(int(self.next_review[slot]))
+        new_day = self._day(next_review)
+        if old_day >= 0:
+            self.forecast[old_day] -= 1
+        if new_day >= 0:
+            self.forecast[new_day] += 1
+        self.next_review[slot] = next_review
+
+
+class SessionPlan:
+    """
+    今日練習計畫：一次抽好整批題目，之後每題只需從佇列取出
+    - 新題至多 new_quota 題 (隨機)，其餘名額依 priority 以 weighted_sample 不重複抽舊題
+    - 新題在前、舊題依抽樣順序 (權重高者較前)，與逐題抽題時先新後舊的順序一致
+    - 答錯的題目插回佇列第 gap 個位置，隔幾題再出現；答對 (或已從其他題型答過) 的題目直接作廢
+    """
+
+    def __init__(self, labels, priority, is_new, quota, new_quota, rng=None, gap=5):
+        rng = make_rng(rng)
+        labels = np.asarray(labels)
+        is_new = np.asarray(is_new, dtype=bool)
+        quota = max(int(quota), 0)
+        new_slots = np.flatnonzero(is_new)
+        new_slots = rng.permutation(new_slots)[:max(min(int(new_quota), quota), 0)]
+        old_slots = np.flatnonzero(~is_new)
+        old_slots = old_slots[weighted_sample(np.asarray(priority)[old_slots], quota - len(new_slots), rng)]
+
+        self.gap = gap
+        self.new_count = len(new_slots)
+        self.members = set(labels[new_slots].tolist()) | set(labels[old_slots].tolist())
+        self._queue = deque()
+        self._pending = {}  # label -> 佇列中有效項目的版本；其餘同題項目在取出時略過
+        self._version = 0
+        for label in labels[np.concatenate((new_slots, old_slots))].tolist():
+            self._push(label, len(self._queue))
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _push(self, label, position):
+        self._version += 1
+        self._pending[label] = self._version
+        self._queue.insert(position, (label, self._version))
+
+    def pop(self):
+        """取出下一題的 label；佇列已空時回傳 None"""
+        while self._queue:
+            label, version = self._queue.popleft()
+            if self._pending.get(label) == version:
+                del self._pending[label]
+                return label
+        return None
+
+    def answered(self, label, correct):
+        """作答後呼叫：計畫內的題目答錯就插回佇列 (O(gap))，答對則不再出現"""
+        if label not in self.members:
+            return
+        if correct:
+            self._pending.pop(label, None)
+        else:
+            self._push(label, min(self.gap, len(self._queue)))
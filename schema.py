@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_FORMAT = '%Y-%m-%d'
+
+# 記憶體內的欄位型別；時間欄位為 datetime64[s]，從未複習者為 NaT
+TIME_COLUMNS = ['next_review_date', 'last_reviewed']
+COUNTER_DTYPES = {
+    'review_interval': np.int32,
+    'review_count': np.int32,
+    'consecutive_correct': np.int32,
+    'total_reviews': np.int32,
+}
+META_DEFAULTS = {
+    'next_review_date': pd.NaT,
+    'review_interval': 0,
+    'review_count': 0,
+    'consecutive_correct': 0,
+    'last_reviewed': pd.NaT,
+    'total_reviews': 0,
+    'ease_factor': 2.5,  # SM-2默認EF
+}
+TEXT_COLUMNS = ["Root", "meaning", "Voc", "Memorize", "Sentence", "translation"]
+
+
+def parse_timestamps(values):
+    """Excel 讀入的時間欄位 (字串、datetime 或 0.0/nan 等雜值) 轉成 datetime64[s]"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('datetime64[s]')
+    text = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+    parsed = pd.to_datetime(text, format=TIME_FORMAT, errors='coerce')
+    missing = parsed.isna()
+    if missing.any():
+        # 只有日期的舊資料
+        parsed[missing] = pd.to_datetime(text[missing], format=DATE_FORMAT, errors='coerce')
+    return parsed.astype('datetime64[s]')
+
+
+def format_timestamps(values):
+    """datetime64 欄位轉回 Excel 使用的字串格式，NaT 為空字串"""
+    return values.dt.strftime(TIME_FORMAT).fillna('')
+
+
+def to_seconds(values):
+    """datetime64[s] 欄位的 epoch 秒數檢視 (NaT 為 int64 最小值)"""
+    return np.asarray(values, dtype='datetime64[s]').astype(np.int64)
+
+
+def normalize_meta(data):
+    """補齊 meta 欄位並轉為記憶體內型別 (原地修改)"""
+    for col, default in META_DEFAULTS.items():
+        if col not in data.columns:
+            data[col] = default
+    for col in TIME_COLUMNS:
+        data[col] = parse_timestamps(data[col])
+    for col, dtype in COUNTER_DTYPES.items():
+        data[col] = pd.to_numeric(data[col], errors='coerce').fillna(0).astype(dtype)
+    data['ease_factor'] = pd.to_numeric(data['ease_factor'], errors='coerce').fillna(2.5).astype(float)
+
+    # 其他欄位補齊
+    for col in TEXT_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].fillna("")
+    return data
+
+
+def to_excel_frame(data):
+    """轉成寫回 Excel 用的 DataFrame (時間欄位為字串)"""
+    frame = data.copy()
+    for col in TIME_COLUMNS:
+        if col in frame.columns:
+            frame[col] = format_timestamps(frame[col])
+    return frame
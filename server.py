@@ -0,0 +1,258 @@
+"""
+多人測驗伺服器 (asyncio，TCP 上的 JSON lines)：
+- 題庫文字只載入一次，所有學生共用 (唯讀)；比對索引、題目位置查詢表與文字欄陣列也只建一次
+- 每位學生只有自己的 meta 欄位 (SM-2/AIMD 狀態)，以 CardStore 陣列存在記憶體 (不另外建 DataFrame)
+- 同一位學生的請求以 asyncio.Lock 依序處理；作答先放進佇列，每隔幾秒整批寫入 SQLite
+
+    python server.py --file voc.xlsx --state users.db --port 8765
+
+協定：每行一個 JSON 請求，伺服器回一行 JSON
+    {"cmd": "login", "user": "amy"}
+    {"cmd": "next", "type": "Voc"}                       -> {"ok": true, "card": 12, "hint": "..."}
+    {"cmd": "answer", "text": "abstain", "elapsed": 1.8} (elapsed 省略時以伺服器收到的時間計算)
+    {"cmd": "stats"}
+    {"cmd": "quit"}
+"""
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from cards import CardStore
+from engine import QuizEngine, QUESTION_TYPES
+from scheduler import NAT
+from schema import META_DEFAULTS, TIME_COLUMNS, COUNTER_DTYPES, TIME_FORMAT, to_seconds
+from storage import DeckStorage, JOURNAL_FIELDS, load_deck, sql_value
+
+
+class UserStateStore:
+    """
+    所有學生的 meta 狀態 (SQLite 資料表 user_cards，每位學生每題一列，只存作答過的題目)
+    作答只先放進記憶體佇列，flush() 時在同一個交易內整批寫入
+    """
+
+    TABLE = 'user_cards'
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        types = {col: 'INTEGER' for col in COUNTER_DTYPES}
+        types['ease_factor'] = 'REAL'
+        columns = ', '.join(f"{col} {types.get(col, 'TEXT')}" for col in JOURNAL_FIELDS)
+        with self.conn:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} "
+                f"(user TEXT NOT NULL, card INTEGER NOT NULL, {columns}, PRIMARY KEY (user, card))"
+            )
+        self.pending = {}  # (user, card) -> 欄位值；同一題重複作答只保留最後一次
+
+    def load(self, user, labels):
+        """
+        學生的 meta 陣列 (dict，依題庫順序，時間欄位為 epoch 秒數)，可直接交給 CardStore.from_arrays
+        資料表只存作答過的題目，其餘題目為預設值
+        """
+        columns = {}
+        for col, default in META_DEFAULTS.items():
+            if col in TIME_COLUMNS:
+                columns[col] = np.full(len(labels), NAT, dtype=np.int64)
+            else:
+                columns[col] = np.full(len(labels), default, dtype=COUNTER_DTYPES.get(col, float))
+        rows = pd.read_sql_query(
+            f"SELECT card, {', '.join(JOURNAL_FIELDS)} FROM {self.TABLE} WHERE user = ?",
+            self.conn, params=(user,), index_col='card',
+        )
+        pos = labels.get_indexer(rows.index)
+        rows, pos = rows[pos >= 0], pos[pos >= 0]
+        for col in JOURNAL_FIELDS:
+            values = rows[col]
+            if col in TIME_COLUMNS:
+                values = to_seconds(pd.to_datetime(values, format=TIME_FORMAT))
+            columns[col][pos] = np.asarray(values, dtype=columns[col].dtype)
+        return columns
+
+    def queue(self, user, card, values):
+        self.pending[(user, card)] = values
+
+    def flush(self):
+        """把佇列中的作答整批寫入，回傳筆數"""
+        if not self.pending:
+            return 0
+        pending, self.pending = self.pending, {}
+        placeholders = ', '.join('?' * (len(JOURNAL_FIELDS) + 2))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.TABLE} (user, card, {', '.join(JOURNAL_FIELDS)}) "
+                f"VALUES ({placeholders})",
+                [(user, card, *values) for (user, card), values in pending.items()],
+            )
+        return len(pending)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class UserStorage(DeckStorage):
+    """單一學生的儲存後端：作答放進 UserStateStore 的佇列，由伺服器定期寫入"""
+
+    def __init__(self, store, user):
+        self.store = store
+        self.user = user
+
+    def record_answer(self, cards, index, quality):
+        card = cards.card(index)
+        self.store.queue(self.user, int(index), [sql_value(col, card[col]) for col in JOURNAL_FIELDS])
+
+
+class LearnerSession:
+    """一位學生的引擎 (個人 meta 陣列 + 共用題庫文字) 與請求鎖"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = asyncio.Lock()
+
+
+class QuizServer:
+    def __init__(self, deck_file, state_path, time_limit=5, flush_interval=2.0):
+        deck = load_deck(deck_file)
+        # 題庫文字只留一份；每位學生的 meta 欄位另外存放
+        self.content = deck.drop(columns=[col for col in META_DEFAULTS if col in deck.columns])
+        self.answer_indexes = {}  # 所有學生共用的答案比對索引
+        self.text_columns = {}  # 所有學生共用的文字欄陣列 (CardStore.text 的快取)
+        self.store = UserStateStore(state_path)
+        self.time_limit = time_limit
+        self.flush_interval = flush_interval
+        self.sessions = {}  # user -> LearnerSession
+
+    def get_session(self, user):
+        session = self.sessions.get(user)
+        if session is None:
+            cards = CardStore.from_arrays(
+                self.content, self.store.load(user, self.content.index), text=self.text_columns,
+            )
+            engine = QuizEngine(
+                self.time_limit,
+                None,
+                storage=UserStorage(self.store, user),
+                content=self.content,
+                answer_indexes=self.answer_indexes,
+                cards=cards,
+            )
+            session = self.sessions[user] = LearnerSession(engine)
+        return session
+
+    def handle_request(self, request, state):
+        """處理一個請求 (呼叫端須持有該學生的鎖)；state 為此連線的目前題目等資訊"""
+        engine = state['session'].engine
+        cmd = request.get('cmd')
+        if cmd == 'next':
+            answer_key = request.get('type', 'Voc')
+            if not isinstance(answer_key, str) or answer_key not in QUESTION_TYPES:
+                return {'ok': False, 'error': f"unknown type: {answer_key}"}
+            card = engine.next_card(QUESTION_TYPES[answer_key])
+            state['card'], state['answer_key'], state['shown_at'] = card, answer_key, time.monotonic()
+            if card is None:
+                return {'ok': True, 'card': None, 'reason': 'quota' if engine.quota_reached() else 'empty'}
+            return {'ok': True, 'card': int(card.name), 'hint': engine.format_hint(card, answer_key),
+                    'time_limit': engine.time_limit}
+        if cmd == 'answer':
+            card = state.get('card')
+            if card is None:
+                return {'ok': False, 'error': 'no card; send next first'}
+            elapsed, text = request.get('elapsed'), request.get('text')
+            if elapsed is None:
+                elapsed = time.monotonic() - state['shown_at']
+            elif isinstance(elapsed, bool) or not isinstance(elapsed, (int, float)) or not elapsed >= 0:
+                return {'ok': False, 'error': 'elapsed must be a non-negative number'}
+            if text is not None and not isinstance(text, str):
+                return {'ok': False, 'error': 'text must be a string'}
+            result = engine.submit_answer(card, text, float(elapsed), state['answer_key'])
+            state['card'] = None
+            return {
+                'ok': True,
+                'correct': result.correct,
+                'timeout': result.timeout,
+                'mastered': result.mastered,
+                'quality': result.quality,
+                'answer': card[state['answer_key']],
+                'other_word': result.other_word[0] if result.other_word else None,
+                'next_review_date': str(card['next_review_date']),
+            }
+        if cmd == 'stats':
+            return {'ok': True, 'stats': engine.stats()}
+        return {'ok': False, 'error': f"unknown command: {cmd}"}
+
+    async def handle_client(self, reader, writer):
+        state = {'session': None, 'card': None}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:  # JSONDecodeError 或非 UTF-8 位元組
+                    request = None
+                if not isinstance(request, dict):
+                    response = {'ok': False, 'error': 'request must be a JSON object'}
+                elif request.get('cmd') == 'quit':
+                    break
+                elif request.get('cmd') == 'login':
+                    state['session'], state['card'] = self.get_session(str(request.get('user'))), None
+                    response = {'ok': True}
+                elif state['session'] is None:
+                    response = {'ok': False, 'error': 'login first'}
+                else:
+                    async with state['session'].lock:
+                        try:
+                            response = self.handle_request(request, state)
+                        except Exception as exc:
+                            # 單一請求的錯誤只回報給該用戶端，不中斷連線
+                            response = {'ok': False, 'error': f"{type(exc).__name__}: {exc}"}
+                writer.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # 連線中斷，或單行超過 StreamReader 的長度上限
+        finally:
+            writer.close()
+
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.store.flush()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle_client, host, port, limit=1 << 16)
+        flusher = asyncio.create_task(self.flush_loop())
+        print(f"題庫 {len(self.content)} 題，伺服器啟動於 {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            self.store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多人共用題庫的測驗伺服器")
+    parser.add_argument("--file", default="voc.xlsx", help="Excel 題庫檔 (預設 voc.xlsx)")
+    parser.add_argument("--state", default="users.db", help="學生作答狀態的 SQLite 檔")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--time-limit", type=float, default=5)
+    parser.add_argument("--flush-interval", type=float, default=2.0, help="整批寫入作答狀態的間隔秒數")
+    args = parser.parse_args()
+
+    server = QuizServer(args.file, args.state, args.time_limit, args.flush_interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+蒙地卡羅工作量模擬：以真實的 SM-2/AIMD 規則 (rules.py) 與 priority 抽題，
+對整份題庫逐日模擬學習者作答，多個 seed 分散到多個行程平行執行。
+
+    python simulator.py --runs 64 --days 365 --recall 0.85
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from rules import DEFAULT_AIMD, answer_outcome, answer_quality, next_interval
+from scheduler import DAY_SECONDS, NAT, calculate_priority, datetime_to_seconds, weighted_sample
+from schema import to_seconds
+
+
+def deck_state(data, now=None, recall=0.85, difficulty_penalty=0.05):
+    """
+    從題庫取出模擬所需的卡片狀態陣列 (時間換算成相對於 now 的天數)
+    recall_prob 為每題的基礎回想機率：預設隨錯誤次數遞減，可自行替換成其他陣列
+    """
+    now = datetime_to_seconds(now or datetime.now())
+    next_review = to_seconds(data['next_review_date'])
+    last_reviewed = to_seconds(data['last_reviewed'])
+    review_count = data['review_count'].to_numpy(dtype=np.int64)
+    next_due = np.where(next_review == NAT, np.nan, (next_review - now) / DAY_SECONDS)
+    return {
+        'review_count': review_count,
+        'consecutive_correct': data['consecutive_correct'].to_numpy(dtype=np.int64),
+        'review_interval': data['review_interval'].to_numpy(dtype=np.int64),
+        'ease_factor': data['ease_factor'].to_numpy(dtype=float),
+        'next_due': next_due,
+        'is_new': (review_count == 0) & (last_reviewed == NAT),
+        'recall_prob': np.clip(recall - difficulty_penalty * review_count, 0.05, 0.99),
+    }
+
+
+def simulate_run(state, seed, days=365, daily_max_quota=150, daily_new_quota=50,
+                 new_recall=0.3, forgetting=0.3, time_limit=5, aimd=DEFAULT_AIMD):
+    """
+    單次模擬，回傳每日作答數、待複習積壓數與覆蓋全部題目所需天數 (未覆蓋為 NaN)
+    - 每天先抽至多 daily_new_quota 題新題，其餘配額依 priority 權重抽舊題 (不重複)
+    - 回想機率隨逾期程度衰減：p * exp(-forgetting * overdue_days / interval)
+    """
+    rng = np.random.default_rng(seed)
+    review_count = state['review_count'].copy()
+    consecutive_correct = state['consecutive_correct'].copy()
+    review_interval = state['review_interval'].copy()
+    ease_factor = state['ease_factor'].copy()
+    next_due = state['next_due'].copy()
+    is_new = state['is_new'].copy()
+    recall_prob = state['recall_prob']
+
+    daily_load = np.zeros(days, dtype=np.int64)
+    daily_due = np.zeros(days, dtype=np.int64)
+    coverage_day = np.nan if is_new.any() else 0.0
+
+    for day in range(days):
+        scheduled = ~np.isnan(next_due)
+        due = ~is_new & (~scheduled | (next_due <= day))
+        daily_due[day] = due.sum()
+        overdue_days = np.zeros(len(next_due), dtype=np.int64)
+        overdue_days[scheduled & due] = np.floor(day - next_due[scheduled & due])
+
+        new_slots = np.flatnonzero(is_new)
+        new_slots = rng.permutation(new_slots)[:max(min(daily_new_quota, daily_max_quota), 0)]
+        old_slots = np.flatnonzero(~is_new)
+        weights = calculate_priority(review_count[old_slots], overdue_days[old_slots], 0)
+        old_slots = old_slots[weighted_sample(weights, daily_max_quota - len(new_slots), rng)]
+        answered = np.concatenate((new_slots, old_slots))
+        if len(answered) == 0:
+            continue
+
+        overdue = overdue_days[answered]
+        p = np.where(
+            is_new[answered],
+            new_recall,
+            recall_prob[answered] * np.exp(-forgetting * overdue / np.maximum(review_interval[answered], 1)),
+        )
+        correct = rng.random(len(answered)) < p
+        elapsed = rng.uniform(0.2, 0.9, len(answered)) * time_limit
+        quality = answer_quality(correct.astype(float), elapsed, time_limit)
+
+        review_count[answered], consecutive_correct[answered], _ = answer_outcome(
+            review_count[answered], consecutive_correct[answered], correct
+        )
+        review_interval[answered], ease_factor[answered] = next_interval(
+            review_interval[answered], ease_factor[answered], quality, overdue, aimd
+        )
+        next_due[answered] = day + review_interval[answered]
+        is_new[answered] = False
+
+        daily_load[day] = len(answered)
+        if np.isnan(coverage_day) and not is_new.any():
+            coverage_day = day + 1
+
+    return {'daily_load': daily_load, 'daily_due': daily_due, 'coverage_day': coverage_day}
+
+
+_worker_args = None
+
+
+def _init_worker(state, options):
+    global _worker_args
+    _worker_args = (state, options)
+
+
+def _run_seed(seed):
+    state, options = _worker_args
+    return simulate_run(state, seed, **options)
+
+
+def run_monte_carlo(state, runs=32, seed=0, workers=None, **options):
+    """多個 seed 平行模擬，回傳各次結果串列"""
+    seeds = [seed + i for i in range(runs)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or runs <= 1:
+        return [simulate_run(state, s, **options) for s in seeds]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(state, options)) as pool:
+        return list(pool.map(_run_seed, seeds))
+
+
+def summarize(results):
+    """彙整成分佈：覆蓋天數、每日積壓與作答量的百分位數"""
+    coverage = np.array([r['coverage_day'] for r in results], dtype=float)
+    due = np.stack([r['daily_due'] for r in results])
+    load = np.stack([r['daily_load'] for r in results])
+    covered = coverage[~np.isnan(coverage)]
+    return {
+        'runs': len(results),
+        'covered_runs': len(covered),
+        'coverage_days': np.percentile(covered, [5, 50, 95]) if len(covered) else None,
+        'peak_due': np.percentile(due.max(axis=1), [5, 50, 95]),
+        'mean_load': float(load.mean()),
+        'daily_due_p50': np.percentile(due, 50, axis=0),
+        'daily_due_p95': np.percentile(due, 95, axis=0),
+        'daily_load_p50': np.percentile(load, 50, axis=0),
+    }
+
+
+def print_summary(summary, days):
+    print(f"模擬次數: {summary['runs']}，{days} 天內覆蓋全部題目: {summary['covered_runs']} 次")
+    if summary['coverage_days'] is not None:
+        p5, p50, p95 = summary['coverage_days']
+        print(f"覆蓋天數 (p5/p50/p95): {p5:.0f} / {p50:.0f} / {p95:.0f}")
+    p5, p50, p95 = summary['peak_due']
+    print(f"待複習積壓峰值 (p5/p50/p95): {p5:.0f} / {p50:.0f} / {p95:.0f}")
+    print(f"平均每日作答數: {summary['mean_load']:.1f}")
+    print("\n  天數   積壓 p50   積壓 p95   作答 p50")
+    for day in sorted({0, 6, 13, 29, 59, 89, 179, 364, days - 1}):
+        if day < days:
+            print(f"{day + 1:6d} {summary['daily_due_p50'][day]:10.0f} "
+                  f"{summary['daily_due_p95'][day]:10.0f} {summary['daily_load_p50'][day]:10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="以 SM-2/AIMD 規則模擬每日工作量與覆蓋天數")
+    parser.add_argument("--file", default="voc.xlsx", help="Excel 題庫檔 (預設 voc.xlsx)")
+    parser.add_argument("--runs", type=int, default=32, help="模擬次數 (seed 數)")
+    parser.add_argument("--days", type=int, default=365, help="模擬天數")
+    parser.add_argument("--max-quota", type=int, default=150, help="每日最大題數")
+    parser.add_argument("--new-quota", type=int, default=50, help="每日新單字數量")
+    parser.add_argument("--recall", type=float, default=0.85, help="舊題基礎回想機率")
+    parser.add_argument("--difficulty-penalty", type=float, default=0.05, help="每次錯誤降低的回想機率")
+    parser.add_argument("--new-recall", type=float, default=0.3, help="新題 (盲測) 答對機率")
+    parser.add_argument("--forgetting", type=float, default=0.3, help="逾期造成的遺忘速率")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="平行行程數 (預設為 CPU 核心數)")
+    args = parser.parse_args()
+
+    from storage import ExcelStorage
+    storage = ExcelStorage(args.file)
+    data = storage.load()
+    storage.restore(data)
+    state = deck_state(data, recall=args.recall, difficulty_penalty=args.difficulty_penalty)
+
+    start = time.perf_counter()
+    results = run_monte_carlo(
+        state, runs=args.runs, seed=args.seed, workers=args.workers,
+        days=args.days, daily_max_quota=args.max_quota, daily_new_quota=args.new_quota,
+        new_recall=args.new_recall, forgetting=args.forgetting,
+    )
+    print(f"題目數: {len(data)}，每日總題數: {args.max_quota}，每日新題: {args.new_quota}，"
+          f"耗時 {time.perf_counter() - start:.2f} 秒\n")
+    print_summary(summarize(results), args.days)
+
+
+if __name__ == "__main__":
+    main()
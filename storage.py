@@ -0,0 +1,574 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from schema import META_DEFAULTS, TIME_COLUMNS, COUNTER_DTYPES, TIME_FORMAT, normalize_meta, to_excel_frame
+
+
+JOURNAL_FIELDS = list(META_DEFAULTS)
+CACHE_VERSION = 2
+WORKBOOK_CHUNK_ROWS = 2000  # 串流讀寫 Excel 時每次整理的列數
+
+
+def read_workbook(path, progress=None, chunk_rows=WORKBOOK_CHUNK_ROWS):
+    """
+    以 openpyxl 唯讀模式逐列讀取第一個工作表，每 chunk_rows 列整理一次型別後填入預先配置的欄位陣列，
+    不必先把整份工作表展開成 Python 物件；結果與 normalize_meta(pd.read_excel(path)) 相同
+    progress(done, total) 每個 chunk 呼叫一次，total 取自工作表的尺寸資訊 (可能為 None)
+    """
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        total = sheet.max_row - 1 if sheet.max_row else None
+        rows = sheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        while header and header[-1] is None:
+            header.pop()
+        columns = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+        width = len(columns)
+
+        buffers = _ColumnBuffers(total or chunk_rows)
+        chunk, blank, done = [], 0, 0
+        for row in rows:
+            row = row[:width]
+            if all(value is None for value in row):
+                blank += 1  # 中間的空白列保留 (列號即題目 index)，結尾的空白列捨棄
+                continue
+            if blank:
+                chunk.extend([(None,) * width] * blank)
+                blank = 0
+            chunk.append(row + (None,) * (width - len(row)))
+            if len(chunk) >= chunk_rows:
+                buffers.append(normalize_meta(pd.DataFrame.from_records(chunk, columns=columns)))
+                done += len(chunk)
+                chunk = []
+                if progress is not None:
+                    progress(done, total)
+        if chunk or not done:
+            buffers.append(normalize_meta(pd.DataFrame.from_records(chunk, columns=columns)))
+            done += len(chunk)
+        if progress is not None:
+            progress(done, done)
+    finally:
+        workbook.close()
+    return buffers.frame()
+
+
+class _ColumnBuffers:
+    """
+    read_workbook 的欄位陣列：meta 欄位依 normalize_meta 的型別配置 (int32 / float64 / datetime64[s])，
+    其他欄位為 object 陣列，最後再推斷型別；容量不足時加倍，尖峰記憶體約為結果加一個 chunk
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(capacity, 1)
+        self.size = 0
+        self.empty = None  # 第一個 chunk 的 0 列 DataFrame，保留欄名與順序
+        self.arrays = []  # 依欄位位置排列 (欄名可能重複)
+
+    def append(self, chunk):
+        if self.empty is None:
+            self.empty = chunk.iloc[:0]
+            self.arrays = [
+                np.empty(self.capacity, dtype=values.dtype if col in META_DEFAULTS else object)
+                for col, values in chunk.items()
+            ]
+        end = self.size + len(chunk)
+        if end > self.capacity:
+            self.capacity = max(end, 2 * self.capacity)
+            for i, array in enumerate(self.arrays):
+                self.arrays[i] = np.empty(self.capacity, dtype=array.dtype)
+                self.arrays[i][:self.size] = array[:self.size]
+        for array, (_, values) in zip(self.arrays, chunk.items()):
+            array[self.size:end] = values.to_numpy()
+        self.size = end
+
+    def frame(self):
+        if self.size == 0:
+            return self.empty
+        data = {}
+        for i in range(len(self.arrays)):
+            array, self.arrays[i] = self.arrays[i], None  # 逐欄轉換，舊陣列隨即釋放
+            if self.size < len(array):
+                array = array[:self.size].copy()
+            values = pd.Series(array, copy=False)
+            if array.dtype == object:
+                values = values.infer_objects()
+                if values.dtype == object and values.isna().all():
+                    values = values.astype(float)  # 整欄空白，與 read_excel 相同為 NaN
+            data[i] = values
+        frame = pd.DataFrame(data, copy=False)
+        frame.columns = self.empty.columns
+        return frame
+
+
+def write_workbook(data, path, progress=None, chunk_rows=WORKBOOK_CHUNK_ROWS):
+    """
+    以 openpyxl 只寫模式逐列寫出題庫 (內容同 to_excel_frame(data).to_excel(path, index=False))，
+    每次只把 chunk_rows 列轉成 Excel 格式；path 可為檔名或二進位檔案物件
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append(list(data.columns))
+    total = len(data)
+    for start in range(0, total, chunk_rows):
+        frame = to_excel_frame(data.iloc[start:start + chunk_rows]).astype(object)
+        for row in frame.where(frame.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+        if progress is not None:
+            progress(min(start + chunk_rows, total), total)
+    workbook.save(path)
+
+
+class DeckCache:
+    """
+    題庫的二進位快取 (NumPy .npz，存放在 voc.xlsx.cache)，內容為整理後的 DataFrame：
+    - 以 allow_pickle=False 讀取，快取檔只含數值陣列與 JSON，被竄改也不會執行程式碼
+    - header (JSON) 記錄 Excel 檔的大小、mtime 與內容 hash，先比對 header 才讀取資料欄
+    - 數值與時間欄存成陣列，文字欄存成 JSON 字串清單
+    - 使用者用 Excel 編輯題庫後會自動失效，重新讀取 xlsx
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.path = filename + '.cache'
+
+    def _stat_key(self):
+        st = os.stat(self.filename)
+        return [st.st_size, st.st_mtime_ns]
+
+    def _digest(self):
+        sha = hashlib.sha256()
+        with open(self.filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    @staticmethod
+    def _json_array(value):
+        return np.frombuffer(json.dumps(value, ensure_ascii=False).encode('utf-8'), dtype=np.uint8)
+
+    @staticmethod
+    def _read_json(npz, name):
+        return json.loads(npz[name].tobytes().decode('utf-8'))
+
+    def load(self):
+        """快取有效時回傳 DataFrame，否則回傳 None"""
+        try:
+            with np.load(self.path, allow_pickle=False) as npz:
+                header = self._read_json(npz, 'header')
+                if header.get('version') != CACHE_VERSION:
+                    return None
+                if header['stat'] != self._stat_key():
+                    # mtime 變了但內容可能相同 (例如複製或還原檔案)
+                    digest = self._digest()
+                    if header['digest'] != digest:
+                        return None
+                else:
+                    digest = None
+                data = self._read_frame(npz, header)
+        except Exception:  # 檔案不存在、損壞或不是這個格式的快取，都當作失效
+            return None
+        if digest is not None:
+            self.store(data, digest)
+        return data
+
+    def _read_frame(self, npz, header):
+        index = pd.Index(npz['index']) if header['index'] == 'array' else pd.Index(self._read_json(npz, 'index'))
+        columns = {}
+        for i, (kind, dtype) in enumerate(header['kinds']):
+            if kind == 'array':
+                columns[i] = pd.Series(npz[f'c{i}'], index=index, copy=False)
+            else:
+                columns[i] = pd.Series(self._read_json(npz, f'c{i}'), index=index, dtype=dtype)
+        data = pd.DataFrame(columns, index=index)
+        data.columns = pd.Index(header['columns'], dtype=header['columns_dtype'])
+        return data
+
+    def store(self, data, digest=None):
+        """以目前 Excel 檔的狀態為 key 寫入快取；有無法存成陣列或 JSON 的值時不寫入"""
+        arrays, kinds = {}, []
+        for i, (_, col) in enumerate(data.items()):
+            if isinstance(col.dtype, np.dtype) and col.dtype.kind in 'biufmM':
+                arrays[f'c{i}'] = col.to_numpy()
+                kinds.append(('array', str(col.dtype)))
+            else:
+                kinds.append(('json', str(col.dtype)))
+        try:
+            for i, (_, col) in enumerate(data.items()):
+                if kinds[i][0] == 'json':
+                    arrays[f'c{i}'] = self._json_array(col.tolist())
+            if data.index.dtype.kind in 'iu':
+                arrays['index'], index_kind = data.index.to_numpy(), 'array'
+            else:
+                arrays['index'], index_kind = self._json_array(data.index.tolist()), 'json'
+            arrays['header'] = self._json_array({
+                'version': CACHE_VERSION,
+                'stat': self._stat_key(),
+                'digest': digest or self._digest(),
+                'columns': data.columns.tolist(),
+                'columns_dtype': str(data.columns.dtype),
+                'kinds': kinds,
+                'index': index_kind,
+            })
+        except (TypeError, ValueError):
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self.path)
+
+
+def load_deck(filename, use_cache=True, progress=None):
+    """讀取題庫並整理 meta 欄位；有效快取存在時略過 openpyxl 解析"""
+    cache = DeckCache(filename) if use_cache else None
+    if cache is not None:
+        data = cache.load()
+        if data is not None:
+            return data
+    data = read_workbook(filename, progress=progress)
+    if cache is not None:
+        cache.store(data)
+    return data
+
+
+class ReviewJournal:
+    """
+    作答紀錄的 append-only 日誌 (JSON lines，存放在 voc.xlsx.journal)：
+    - 每次作答只追加一行並 fsync，當機或 Ctrl-C 最多遺失正在寫的那一筆
+    - 啟動時把日誌重播到上一次的 Excel 快照上
+    - checkpoint() 把整份題庫寫回 Excel 後清空日誌，可在背景執行
+    """
+
+    def __init__(self, filename, cache=None):
+        self.filename = filename
+        self.cache = cache  # 寫回 Excel 後一併更新的 DeckCache
+        self.path = filename + '.journal'
+        self.compacting_path = filename + '.journal.compacting'
+        self.pending = 0  # 上次 checkpoint 後新增的筆數
+        self._file = None
+        self._lock = threading.Lock()
+        self._compactor = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+
+    def append(self, *entries):
+        """追加一或多筆紀錄，整批只 fsync 一次"""
+        lines = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+        with self._lock:
+            f = self._open()
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+            self.pending += len(entries)
+
+    @staticmethod
+    def _read_entries(path):
+        entries = []
+        if not os.path.exists(path):
+            return entries
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 寫到一半中斷的最後一行
+                    break
+        return entries
+
+    def replay(self, data):
+        """把尚未寫回 Excel 的作答套用到 data，回傳套用筆數"""
+        entries = self._read_entries(self.compacting_path) + self._read_entries(self.path)
+        if not entries:
+            return 0
+        journal = pd.DataFrame(entries).drop_duplicates('index', keep='last').set_index('index')
+        journal = journal[journal.index.isin(data.index)]
+        # 使用者若在 Excel 中插入或刪除列，索引對不上的紀錄直接略過
+        if 'Voc' in data.columns:
+            journal = journal[data.loc[journal.index, 'Voc'].to_numpy() == journal['Voc'].to_numpy()]
+        for col in JOURNAL_FIELDS:
+            values = journal[col]
+            if col in TIME_COLUMNS:
+                values = pd.to_datetime(values, format=TIME_FORMAT, errors='coerce').astype('datetime64[s]')
+            elif col in COUNTER_DTYPES:
+                values = values.astype(COUNTER_DTYPES[col])
+            data.loc[journal.index, col] = values
+        self.pending = len(entries)
+        return len(journal)
+
+    @staticmethod
+    def _entry(cards, index, quality):
+        row = cards.card(index)
+        entry = {'index': int(index), 'Voc': row.get('Voc', ''), 'quality': int(quality)}
+        for col in JOURNAL_FIELDS:
+            value = row[col]
+            if col in TIME_COLUMNS:
+                value = '' if pd.isna(value) else value.strftime(TIME_FORMAT)
+            elif col in COUNTER_DTYPES:
+                value = int(value)
+            else:
+                value = float(value)
+            entry[col] = value
+        return entry
+
+    def record(self, cards, index, quality):
+        """記錄單題作答後的完整 meta 狀態 (cards 為 CardStore)"""
+        self.append(self._entry(cards, index, quality))
+
+    def record_many(self, cards, indices, qualities):
+        self.append(*(self._entry(cards, index, quality) for index, quality in zip(indices, qualities)))
+
+    def is_compacting(self):
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def checkpoint(self, data, background=False):
+        """把目前題庫寫回 Excel 並清空日誌；background=True 時在背景執行緒寫檔"""
+        self.wait()
+        snapshot = data.copy()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                if os.path.exists(self.compacting_path):
+                    # 上次壓縮未完成：併入同一份待壓縮日誌
+                    with open(self.path, encoding='utf-8') as src, \
+                            open(self.compacting_path, 'a', encoding='utf-8') as dst:
+                        dst.write(src.read())
+                    os.remove(self.path)
+                else:
+                    os.replace(self.path, self.compacting_path)
+            self.pending = 0
+
+        if background:
+            self._compactor = threading.Thread(target=self._write_snapshot, args=(snapshot,), daemon=False)
+            self._compactor.start()
+        else:
+            self._write_snapshot(snapshot)
+
+    def _write_snapshot(self, snapshot):
+        tmp_path = self.filename + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            write_workbook(snapshot, f)
+        os.replace(tmp_path, self.filename)
+        if self.cache is not None:
+            self.cache.store(snapshot)
+        if os.path.exists(self.compacting_path):
+            os.remove(self.compacting_path)
+
+    def wait(self):
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def close(self):
+        self.wait()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class DeckStorage:
+    """
+    題庫儲存後端介面；基底類別本身不做任何持久化 (適合模擬與測試)
+    - load(): 讀出整理後的 DataFrame
+    - restore(data): 把尚未寫回的作答套用到 data，回傳還原題數
+    - record_answer(cards, ...): 每次作答後呼叫，只處理單題；cards 為 CardStore
+    - save(data): 結束時完整寫回 (data 為已 sync 的 DataFrame)
+    - answered_count(day) / due_count(required_columns, now)：能直接在儲存端查詢的後端覆寫，
+      預設回傳 None，由引擎改用記憶體內的計數器
+    """
+
+    def load(self):
+        raise NotImplementedError
+
+    def restore(self, data):
+        return 0
+
+    def record_answer(self, cards, index, quality):
+        pass
+
+    def record_answers(self, cards, indices, qualities):
+        """批次作答；預設逐題呼叫 record_answer"""
+        for index, quality in zip(indices, qualities):
+            self.record_answer(cards, index, quality)
+
+    def save(self, data):
+        pass
+
+    def answered_count(self, day):
+        return None
+
+    def due_count(self, required_columns, now):
+        return None
+
+    def close(self):
+        pass
+
+
+class ExcelStorage(DeckStorage):
+    """voc.xlsx + 二進位快取 + 作答日誌"""
+
+    def __init__(self, filename, checkpoint_every=100, progress=None):
+        self.filename = filename
+        self.checkpoint_every = checkpoint_every  # 累積多少筆作答後於背景寫回 Excel
+        self.progress = progress  # 讀取 xlsx 時的 progress(done, total)
+        self.cache = DeckCache(filename)
+        self.journal = ReviewJournal(filename, cache=self.cache)
+
+    def load(self):
+        return load_deck(self.filename, progress=self.progress)
+
+    def restore(self, data):
+        return self.journal.replay(data)
+
+    def record_answer(self, cards, index, quality):
+        self.journal.record(cards, index, quality)
+        self._maybe_checkpoint(cards)
+
+    def record_answers(self, cards, indices, qualities):
+        self.journal.record_many(cards, indices, qualities)
+        self._maybe_checkpoint(cards)
+
+    def _maybe_checkpoint(self, cards):
+        if self.journal.pending >= self.checkpoint_every and not self.journal.is_compacting():
+            self.journal.checkpoint(cards.sync(), background=True)
+
+    def save(self, data):
+        self.journal.checkpoint(data)
+
+    def close(self):
+        self.journal.close()
+
+
+def sql_value(col, value):
+    """欄位值轉成 SQLite 參數：時間欄位為字串 (NaT 為 NULL)，計數欄位為整數"""
+    if col in TIME_COLUMNS:
+        return None if pd.isna(value) else pd.Timestamp(value).strftime(TIME_FORMAT)
+    if col in COUNTER_DTYPES:
+        return int(value)
+    if col == 'ease_factor':
+        return float(value)
+    return None if pd.isna(value) else value
+
+
+class SqliteStorage(DeckStorage):
+    """
+    SQLite 後端：每次作答在交易中更新單列，
+    next_review_date / last_reviewed 建有索引，今日作答數 (每日配額) 與各題型到期數 (選單 3) 直接在資料庫查詢
+    抽題用的排程索引仍需各題的 meta 狀態，load() 時整表讀進記憶體
+    時間欄位存成 '%Y-%m-%d %H:%M:%S' 字串，字典序即時間序
+    連線可跨執行緒使用 (quiz.py 在背景執行緒載入題庫，作答在主執行緒寫入)，以 _lock 確保同時只有一個使用者
+    """
+
+    TABLE = 'cards'
+
+    def __init__(self, path, create=False):
+        """create=False 時檔案必須已存在；否則 sqlite3.connect 會先建立空檔再回報找不到題庫"""
+        if not create and not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _quote(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    def _sql_value(self, col, value):
+        return sql_value(col, value)
+
+    def import_frame(self, data):
+        """以 DataFrame (通常來自 Excel) 重建整個資料表"""
+        frame = to_excel_frame(data)
+        for col in TIME_COLUMNS:
+            frame[col] = frame[col].replace('', None)
+        columns = [c for c in frame.columns if c != 'id']
+        types = {col: 'INTEGER' for col in COUNTER_DTYPES}
+        types['ease_factor'] = 'REAL'
+        column_defs = ', '.join(f"{self._quote(c)} {types.get(c, 'TEXT')}" for c in columns)
+        placeholders = ', '.join('?' * (len(columns) + 1))
+        rows = (
+            (int(index), *(self._sql_value(c, v) for c, v in zip(columns, values)))
+            for index, values in zip(frame.index, frame[columns].itertuples(index=False))
+        )
+        with self._lock, self.conn:
+            self.conn.execute(f"DROP TABLE IF EXISTS {self.TABLE}")
+            self.conn.execute(f"CREATE TABLE {self.TABLE} (id INTEGER PRIMARY KEY, {column_defs})")
+            self.conn.executemany(f"INSERT INTO {self.TABLE} VALUES ({placeholders})", rows)
+            self._create_indexes()
+
+    def _create_indexes(self):
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_next_review ON {self.TABLE} (next_review_date)")
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_last_reviewed ON {self.TABLE} (last_reviewed)")
+
+    def load(self):
+        with self._lock:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.TABLE,)
+            ).fetchone()
+            if not exists:
+                raise FileNotFoundError(self.path)
+            with self.conn:
+                self._create_indexes()  # 沒有索引的舊資料庫補建
+            data = pd.read_sql_query(f"SELECT * FROM {self.TABLE} ORDER BY id", self.conn, index_col='id')
+        data.index.name = None
+        return normalize_meta(data)
+
+    def record_answer(self, cards, index, quality):
+        self.record_answers(cards, [index], [quality])
+
+    def record_answers(self, cards, indices, qualities):
+        """同一個交易內更新所有作答的題目"""
+        assignments = ', '.join(f"{self._quote(c)} = ?" for c in JOURNAL_FIELDS)
+        params = []
+        for index in indices:
+            card = cards.card(index)
+            params.append((*(self._sql_value(c, card[c]) for c in JOURNAL_FIELDS), int(index)))
+        with self._lock, self.conn:
+            self.conn.executemany(f"UPDATE {self.TABLE} SET {assignments} WHERE id = ?", params)
+
+    def due_count(self, required_columns, now):
+        """題型欄位齊全且已到期 (或從未排程) 的題數"""
+        conditions = ' AND '.join(f"{self._quote(c)} IS NOT NULL" for c in required_columns)
+        query = (
+            f"SELECT COUNT(*) FROM {self.TABLE} WHERE {conditions or '1'} "
+            f"AND (next_review_date IS NULL OR next_review_date <= ?)"
+        )
+        with self._lock:
+            return self.conn.execute(query, (now.strftime(TIME_FORMAT),)).fetchone()[0]
+
+    def answered_count(self, day):
+        """指定日期 (date) 的作答題數"""
+        start = pd.Timestamp(day)
+        end = start + pd.Timedelta(days=1)
+        query = f"SELECT COUNT(*) FROM {self.TABLE} WHERE last_reviewed >= ? AND last_reviewed < ?"
+        with self._lock:
+            return self.conn.execute(query, (start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT))).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def import_excel(xlsx_path, db_path, progress=None):
+    """Excel 題庫匯入 SQLite"""
+    storage = SqliteStorage(db_path, create=True)
+    storage.import_frame(load_deck(xlsx_path, progress=progress))
+    storage.close()
+
+
+def export_excel(db_path, xlsx_path, progress=None):
+    """SQLite 題庫匯出成 Excel，方便非技術背景的使用者編輯"""
+    storage = SqliteStorage(db_path)
+    write_workbook(storage.load(), xlsx_path, progress=progress)
+    storage.close()
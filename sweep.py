@@ -0,0 +1,191 @@
+"""
+配額與 AIMD 常數的參數掃描：對模擬學習者跑完整個參數格點，
+格點分散到所有 CPU 核心，每組設定的結果快取在 voc.xlsx.sweep.json，
+最後列出覆蓋天數與每日積壓峰值的對照表並輸出 CSV。
+
+    python sweep.py --max-quota 100,150,200 --new-quota 20,50 --additive 1,2 --csv sweep.csv
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from rules import AimdParams, DEFAULT_AIMD
+from simulator import deck_state, simulate_run, summarize
+
+
+GRID_FIELDS = ['daily_max_quota', 'daily_new_quota'] + list(AimdParams._fields)
+RESULT_FIELDS = ['coverage_p50', 'coverage_p95', 'covered_runs', 'peak_due_p50', 'peak_due_p95', 'mean_load']
+
+
+def parse_list(text, cast):
+    return [cast(value) for value in text.split(',') if value.strip()]
+
+
+def config_key(config, learner, deck_digest):
+    """同一份題庫、學習者模型與參數組合對應同一個快取 key"""
+    payload = json.dumps({'config': config, 'learner': learner, 'deck': deck_digest}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def state_digest(state):
+    sha = hashlib.sha1()
+    for name in sorted(state):
+        sha.update(name.encode('utf-8'))
+        sha.update(np.ascontiguousarray(state[name]).tobytes())
+    return sha.hexdigest()
+
+
+_worker_state = None
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+
+def evaluate_config(config, learner, state=None):
+    """以多個 seed 模擬單組參數，回傳摘要數值"""
+    state = state if state is not None else _worker_state
+    aimd = AimdParams(**{name: config[name] for name in AimdParams._fields})
+    results = [
+        simulate_run(
+            state, learner['seed'] + i, days=learner['days'],
+            daily_max_quota=config['daily_max_quota'], daily_new_quota=config['daily_new_quota'],
+            new_recall=learner['new_recall'], forgetting=learner['forgetting'], aimd=aimd,
+        )
+        for i in range(learner['runs'])
+    ]
+    summary = summarize(results)
+    coverage = summary['coverage_days']
+    return {
+        'coverage_p50': None if coverage is None else float(coverage[1]),
+        'coverage_p95': None if coverage is None else float(coverage[2]),
+        'covered_runs': summary['covered_runs'],
+        'peak_due_p50': float(summary['peak_due'][1]),
+        'peak_due_p95': float(summary['peak_due'][2]),
+        'mean_load': summary['mean_load'],
+    }
+
+
+def load_cache(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(path, cache):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def run_sweep(state, grid, learner, cache_path=None, workers=None):
+    """掃描整個參數格點；已快取的組合直接沿用，其餘平行計算"""
+    cache = load_cache(cache_path) if cache_path else {}
+    digest = state_digest(state)
+    keys = [config_key(config, learner, digest) for config in grid]
+    todo = [(key, config) for key, config in zip(keys, grid) if key not in cache]
+
+    if todo:
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(todo) == 1:
+            computed = [evaluate_config(config, learner, state) for _, config in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(state,)) as pool:
+                computed = list(pool.map(evaluate_config, [c for _, c in todo],
+                                         itertools.repeat(learner)))
+        for (key, _), result in zip(todo, computed):
+            cache[key] = result
+        if cache_path:
+            save_cache(cache_path, cache)
+
+    return [dict(config, **cache[key]) for key, config in zip(keys, grid)], len(grid) - len(todo)
+
+
+def print_table(rows):
+    def sort_key(row):
+        return (row['coverage_p50'] is None, row['coverage_p50'] or 0, row['peak_due_p50'])
+
+    print(f"{'每日上限':>8} {'新題':>6} {'增長':>6} {'遞減':>6} {'EF+':>6} {'EF-':>6} "
+          f"{'覆蓋p50':>8} {'覆蓋p95':>8} {'積壓峰p50':>10} {'積壓峰p95':>10}")
+    for row in sorted(rows, key=sort_key):
+        coverage_p50 = '-' if row['coverage_p50'] is None else f"{row['coverage_p50']:.0f}"
+        coverage_p95 = '-' if row['coverage_p95'] is None else f"{row['coverage_p95']:.0f}"
+        print(f"{row['daily_max_quota']:>8} {row['daily_new_quota']:>6} {row['additive_growth']:>6} "
+              f"{row['decrease_factor']:>6} {row['ef_up']:>6} {row['ef_down']:>6} "
+              f"{coverage_p50:>8} {coverage_p95:>8} {row['peak_due_p50']:>10.0f} {row['peak_due_p95']:>10.0f}")
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=GRID_FIELDS + RESULT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({name: row[name] for name in GRID_FIELDS + RESULT_FIELDS})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="掃描每日配額與 AIMD 常數，比較覆蓋天數與每日負荷")
+    parser.add_argument("--file", default="voc.xlsx", help="Excel 題庫檔 (預設 voc.xlsx)")
+    parser.add_argument("--max-quota", default="100,150,200", help="每日最大題數，逗號分隔")
+    parser.add_argument("--new-quota", default="20,50", help="每日新單字數量，逗號分隔")
+    parser.add_argument("--additive", default=str(DEFAULT_AIMD.additive_growth), help="答對時間隔加性增長")
+    parser.add_argument("--decrease", default=str(DEFAULT_AIMD.decrease_factor), help="答錯時間隔乘上的比例")
+    parser.add_argument("--ef-up", default=str(DEFAULT_AIMD.ef_up), help="答對時 EF 提升量")
+    parser.add_argument("--ef-down", default=str(DEFAULT_AIMD.ef_down), help="答錯時 EF 下降量")
+    parser.add_argument("--runs", type=int, default=8, help="每組參數的模擬次數")
+    parser.add_argument("--days", type=int, default=365, help="模擬天數")
+    parser.add_argument("--recall", type=float, default=0.85, help="舊題基礎回想機率")
+    parser.add_argument("--new-recall", type=float, default=0.3, help="新題 (盲測) 答對機率")
+    parser.add_argument("--forgetting", type=float, default=0.3, help="逾期造成的遺忘速率")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="平行行程數 (預設為 CPU 核心數)")
+    parser.add_argument("--csv", default="sweep.csv", help="輸出 CSV 檔")
+    parser.add_argument("--no-cache", action="store_true", help="不讀寫結果快取")
+    args = parser.parse_args()
+
+    from storage import ExcelStorage
+    storage = ExcelStorage(args.file)
+    data = storage.load()
+    storage.restore(data)
+    # 以今天零時為基準，同一天內重跑可以命中快取
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    state = deck_state(data, now=today, recall=args.recall)
+
+    grid = [
+        dict(DEFAULT_AIMD._asdict(), daily_max_quota=max_quota, daily_new_quota=new_quota,
+             additive_growth=additive, decrease_factor=decrease, ef_up=ef_up, ef_down=ef_down)
+        for max_quota, new_quota, additive, decrease, ef_up, ef_down in itertools.product(
+            parse_list(args.max_quota, int), parse_list(args.new_quota, int),
+            parse_list(args.additive, float), parse_list(args.decrease, float),
+            parse_list(args.ef_up, float), parse_list(args.ef_down, float),
+        )
+    ]
+    learner = {
+        'runs': args.runs, 'days': args.days, 'seed': args.seed, 'recall': args.recall,
+        'new_recall': args.new_recall, 'forgetting': args.forgetting,
+    }
+
+    start = time.perf_counter()
+    cache_path = None if args.no_cache else args.file + '.sweep.json'
+    rows, cached = run_sweep(state, grid, learner, cache_path=cache_path, workers=args.workers)
+    print(f"共 {len(grid)} 組參數 (快取 {cached} 組)，耗時 {time.perf_counter() - start:.2f} 秒\n")
+    print_table(rows)
+    write_csv(args.csv, rows)
+    print(f"\n結果已寫入 {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
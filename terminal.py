@@ -0,0 +1,352 @@
+"""
+終端介面 (QuizApp)；會載入 pandas/NumPy，由 quiz.py 在背景執行緒中匯入
+"""
+import threading
+import time
+import os
+import queue
+import select
+import numpy as np
+from colorama import Fore, Style, init
+import sys
+from engine import QuizEngine, QUESTION_TYPES
+from menu import MENU_CHOICES, print_menu, print_statistics, write_summary
+
+
+init(autoreset=True)
+
+
+def read_timed_input(prompt, time_limit, on_timeout=None, stream=None):
+    """
+    讀取一行答案，送出後立即返回 (不再等倒數結束)：
+    - 互動式終端 (非 Windows) 以 select 等待，逾時後仍等使用者輸入完這一行
+    - 其他情況 (管線輸入、Windows) 改用背景讀取執行緒 + queue
+    回傳 (user_input, elapsed_time, timeout)，elapsed_time 以單調時鐘計算；EOF 時 user_input 為 None
+    """
+    stream = stream or sys.stdin
+    print(prompt, end='', flush=True)
+    start = time.perf_counter()
+    timeout = False
+
+    try:
+        use_select = os.name != 'nt' and stream.isatty()
+    except (AttributeError, ValueError):
+        use_select = False
+
+    if use_select:
+        ready, _, _ = select.select([stream], [], [], max(time_limit, 0))
+        if not ready:
+            timeout = True
+            if on_timeout:
+                on_timeout()
+        line = stream.readline()
+    else:
+        lines = queue.Queue(maxsize=1)
+        reader = threading.Thread(target=lambda: lines.put(stream.readline()), daemon=True)
+        reader.start()
+        try:
+            line = lines.get(timeout=max(time_limit, 0))
+        except queue.Empty:
+            timeout = True
+            if on_timeout:
+                on_timeout()
+            line = lines.get()
+
+    elapsed_time = time.perf_counter() - start
+    if not line:
+        return None, elapsed_time, timeout
+    return line.rstrip('\r\n'), elapsed_time, timeout
+
+
+class QuizApp(QuizEngine):
+    """終端介面：抽題、評分與排程都交給 QuizEngine，這裡只負責輸入與顯示"""
+
+    def __init__(self, time_limit, data, filename, seed=None, storage=None, clock=None, answer_log=None,
+                 summary_file=None):
+        super().__init__(time_limit, data, filename, seed=seed, storage=storage, clock=clock, answer_log=answer_log)
+        self.summary_file = summary_file  # 題庫檔名；存檔時一併更新選單 3 用的統計摘要
+        if self.restored:
+            print(f"已從作答日誌還原 {self.restored} 題的進度。")
+
+    def configure_daily_quota(self):
+        """
+        讓使用者設定每日總題數與每日新字數量
+        """
+        print("\n=== 配置每日練習配額 ===")
+        try:
+            max_quota_input = input(f"請輸入每日最大練習題數 (目前 {self.daily_max_quota})，直接 Enter 保持不變：")
+            if max_quota_input.strip():
+                max_quota = int(max_quota_input)
+                if max_quota <= 0:
+                    print("每日最大題數必須大於 0，保持原設定。")
+                else:
+                    self.daily_max_quota = max_quota
+
+            new_quota_input = input(f"請輸入每日新單字數量 (目前 {self.daily_new_quota})，直接 Enter 保持不變：")
+            if new_quota_input.strip():
+                new_quota = int(new_quota_input)
+                if new_quota < 0:
+                    print("每日新單字數量不能為負數，保持原設定。")
+                else:
+                    self.daily_new_quota = new_quota
+
+            print(f"設定完成：每日最大題數={self.daily_max_quota}, 每日新單字數量={self.daily_new_quota}")
+
+        except ValueError:
+            print("輸入格式錯誤，保持原設定。")
+    
+
+    def animate_coverage(self, daily_progress, total_days_needed, duration=1.5, fps=30):
+        """在固定總時長內播放進度條動畫，影格由累積進度曲線內插取樣"""
+        frames = max(1, min(total_days_needed * 10, int(duration * fps)))
+        delay = duration / frames
+        days = np.concatenate(([0], daily_progress["day"]))
+        percents = np.concatenate(([0.0], daily_progress["percent_done"]))
+        for t in np.linspace(0, total_days_needed, frames + 1)[1:]:
+            day = max(int(np.ceil(t)), 1) - 1
+            self.display_progress_bar(
+                float(np.interp(t, days, percents)),
+                daily_progress['cum_new_done'][day],
+                daily_progress['new_total'],
+                daily_progress['cum_old_done'][day],
+                daily_progress['old_total'],
+                daily_progress['remaining_days_est'][day]
+            )
+            time.sleep(delay)
+
+    def display_progress_bar(self, percent, cum_new_done, new_total, cum_old_done, old_total, remaining_days_est):
+        """顯示彩色血量條，並平滑更新"""
+        bar_length = 30
+        filled_length = int(bar_length * percent)
+        empty_length = bar_length - filled_length
+
+        # 根據進度百分比決定顏色
+        if percent < 0.3:
+            color = Fore.RED
+        elif percent < 0.7:
+            color = Fore.YELLOW
+        else:
+            color = Fore.GREEN
+
+        bar = '█' * filled_length + '░' * empty_length
+        print(f"\r{color}[{bar}] {percent*100:6.2f}% "
+            f"(新題 {cum_new_done}/{new_total}, 舊題 {cum_old_done}/{old_total}) "
+            f"剩餘天數: {remaining_days_est}{Style.RESET_ALL}", end='', flush=True)
+
+
+    def simulate_coverage_interactive(self):
+        """互動式模擬每日覆蓋率，SRP 版彩色血量條和平滑動畫"""
+        daily_progress, total_days_needed = self.calculate_daily_progress()
+        if total_days_needed is None:
+            print("以目前的每日配額無法覆蓋所有新單字，請調整配額 (選項 c)。")
+            return
+        if daily_progress is None:
+            print("所有單字已覆蓋完成！")
+            return
+
+        print(f"\n總單字: {len(self.data)}, 每日總題數: {self.daily_max_quota}, 每日新題: {self.daily_new_quota}")
+        print(f"模擬總共需要天數: {total_days_needed}\n")
+
+        self.animate_coverage(daily_progress, total_days_needed)
+
+        # 確保最後顯示 100% 和剩餘天數 0
+        self.display_progress_bar(
+            1.0,
+            daily_progress['cum_new_done'][-1],
+            daily_progress['new_total'],
+            daily_progress['cum_old_done'][-1],
+            daily_progress['old_total'],
+            0
+        )
+        print("\n模擬完成！")
+
+
+    def toggle_burst_mode(self):
+        self.burst_mode = not self.burst_mode
+        mode = "爆練模式" if self.burst_mode else "正常模式"
+        print(f"\n已切換至 {mode}。")
+
+    def plan_today(self):
+        """一次規劃今日 Root 或 Voc 的練習題目，之後選 1/2 時依序出題"""
+        choice = input("\n要規劃哪一種題目？(1: Root, 2: Voc，直接 Enter 為 Voc)：").strip()
+        answer_key = "Root" if choice == "1" else "Voc"
+        plan = self.plan_session(QUESTION_TYPES[answer_key])
+        if not len(plan):
+            print("今日沒有可安排的題目 (可能已達每日配額)。")
+            return
+        print(f"已規劃今日 {answer_key} 練習 {len(plan)} 題 (新題 {plan.new_count} 題)，"
+              f"選 {'1' if answer_key == 'Root' else '2'} 依序作答；答錯的題目會隔幾題再出現。")
+        
+
+
+    
+    
+
+
+    def get_priority_question(self, required_columns):
+        """根據每日配額與 priority 抽出下一題"""
+        question = self.next_card(required_columns)
+        if question is None and self.quota_reached():
+            print(f"\n達到每日最大複習配額 ({self.daily_max_quota} 題)，請明天再繼續練習。")
+        return question
+
+    def display_load_bar(self):
+        # 用錯誤次數比例做簡單負荷條，爆練模式不顯示
+        if self.burst_mode:
+            return
+        max_err = 10
+        avg_error = self.get_statistics().error_total / len(self.cards)
+        ratio = min(avg_error / max_err, 1.0)
+        bar_length = 30
+        filled_length = int(bar_length * ratio)
+        bar = '█' * filled_length + '-' * (bar_length - filled_length)
+        print(f"學習負荷狀態: |{bar}| {avg_error:.2f} 平均錯誤次數")
+
+    def ask_question(self, question, answer_key, hint, required_columns=None):
+        """主流程：呼叫各個子功能，負責整體問答流程"""
+        if required_columns is not None:
+            self.start_prefetch(required_columns, answer_key)
+        elapsed_time, timeout, user_input = self.handle_user_input(hint)
+        self.finish_prefetch()
+        self.invalidate_prefetch(question.name)
+        result = self.submit_answer(question, user_input, elapsed_time, answer_key, timeout=timeout)
+        self.display_answer_result(result)
+        self.display_question_result(question, answer_key, timeout)
+
+
+    def handle_user_input(self, hint):
+        """負責輸入與倒數計時管理"""
+        print(f"\n提示：{hint} (限時 {self.time_limit} 秒)")
+        user_input, elapsed_time, timeout = read_timed_input(
+            "\n請輸入答案：",
+            self.time_limit,
+            on_timeout=lambda: print(f"\n{Fore.RED}時間到！{Style.RESET_ALL}"),
+        )
+        return elapsed_time, timeout, user_input
+
+
+    def display_answer_result(self, result):
+        """負責顯示答題正確性與負荷狀態"""
+        if result.timeout:
+            print(f"{Fore.RED}超時！{Style.RESET_ALL}")
+        elif result.correct:
+            print(f"{Fore.GREEN}正確！{Style.RESET_ALL}")
+            if result.mastered:
+                print(f"{Fore.CYAN}太棒了！這題已經掌握了！{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}錯誤！{Style.RESET_ALL}")
+            if result.other_word is not None:
+                word, exact = result.other_word
+                if exact:
+                    print(f"{Fore.YELLOW}你輸入的是題庫中的另一個單字：{word}{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.YELLOW}你輸入的接近題庫中的另一個單字：{word}{Style.RESET_ALL}")
+
+        with self.timing.stage('display'):
+            self.display_load_bar()
+            self.display_progress()
+
+
+    def display_question_result(self, question, answer_key, timeout):
+        """負責顯示題目結果與相關訊息"""
+        card = self.cards.card(question.name)
+        difficulty_level = "簡單" if card['review_count'] == 0 else "中等" if card['review_count'] <= 2 else "困難"
+        print(f"難度等級: {difficulty_level} (錯誤次數: {card['review_count']})")
+        print(f"下次複習: {card['next_review_date']} ({card['review_interval']} 天後)")
+        if card['consecutive_correct'] > 0:
+            print(f"連續答對: {card['consecutive_correct']} 次")
+
+        
+
+    def display_progress(self):
+        print(f"\n當前分數: {self.score}, 已回答問題數: {self.answered_questions}")
+
+        progress = self.get_progress_counters()
+
+        print(f"待複習題目數: {progress.due_count}")
+        print(f"今日已答題數: {progress.answered_today}, 剩餘新題數: {progress.new_remaining}\n")
+
+    def ask_root_question(self):
+        required_columns = QUESTION_TYPES["Root"]
+        question = self.get_priority_question(required_columns)
+        if question is None:
+            print("\n目前沒有需要複習的 Root 問題。")
+            return False
+        self.ask_question(
+            question,
+            answer_key="Root",
+            hint=question.get('hint') or self.format_hint(question, "Root"),
+            required_columns=required_columns,
+        )
+        return True
+
+    def ask_voc_question(self):
+        required_columns = QUESTION_TYPES["Voc"]
+        question = self.get_priority_question(required_columns)
+        if question is None:
+            print("\n目前沒有需要複習的 Voc 問題。")
+            return False
+
+        self.ask_question(
+            question,
+            answer_key="Voc",
+            hint=question.get('hint') or self.format_hint(question, "Voc"),
+            required_columns=required_columns,
+        )
+
+        print(f"\n正確答案：{question['Voc']}")
+        print(f"句子：{question['Sentence']}")
+        print(f"翻譯：{question['translation']}")
+
+        return True
+
+    def save_progress(self):
+        stats = self.stats() if self.summary_file else None  # save() 會關閉儲存後端，統計須先算好
+        self.save()
+        if self.summary_file:
+            write_summary(self.summary_file, stats, now=self.clock())
+        print("\n進度已儲存！")
+
+    def get_today_visited_count(self):
+        return self.get_daily_answered_count()
+
+    def show_statistics(self):
+        print_statistics(self.stats())
+
+        if self.timing.stages:
+            print(f"\n各階段耗時 (量測{'中' if self.timing.enabled else '已暫停'}):")
+            print(self.timing.format_summary())
+
+    def run_quiz(self, first_choice=None):
+        """first_choice：題庫載入前使用者已在 quiz.py 的選單輸入的選項"""
+        while True:
+            if first_choice is not None:
+                user_choice, first_choice = first_choice, None
+            else:
+                print_menu(self.burst_mode, self.timing.enabled, self.planned_count())
+                user_choice = input(f"請輸入選項 ({MENU_CHOICES})：").strip().lower()
+
+            if user_choice == "q":
+                self.save_progress()
+                print("測試已結束，進度已儲存。")
+                break
+            elif user_choice == "1":
+                self.ask_root_question()
+            elif user_choice == "2":
+                self.ask_voc_question()
+            elif user_choice == "3":
+                self.show_statistics()
+            elif user_choice == "4":
+                self.toggle_burst_mode()
+            elif user_choice.lower() == "c":
+                self.configure_daily_quota()
+            elif user_choice.lower() == "s":
+                self.simulate_coverage_interactive()
+            elif user_choice == "d":
+                self.plan_today()
+            elif user_choice == "p":
+                self.timing.enabled = not self.timing.enabled
+                print(f"\n效能量測已{'開啟' if self.timing.enabled else '關閉'}，結果顯示在統計資料 (3)。")
+            else:
+                print("\n無效選項，請重試。")
+
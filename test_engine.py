@@ -0,0 +1,88 @@
+"""
+引擎測試：python -m pytest test_engine.py (或 python -m unittest test_engine)
+"""
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from engine import QuizEngine, ManualClock
+from rules import answer_quality
+from scheduler import NAT, DAY_SECONDS, datetime_to_seconds
+from schema import META_DEFAULTS
+from storage import DeckStorage
+
+
+WORDS = ["abstain", "exacerbate", "abrogate", "abnegate", "placate", "laconic", "obdurate", "venerate"]
+START = datetime(2024, 3, 1, 9, 0, 0)
+
+
+def make_deck():
+    data = pd.DataFrame({
+        "Voc": WORDS,
+        "Sentence": [f"sentence {word}" for word in WORDS],
+        "translation": [f"翻譯 {word}" for word in WORDS],
+        "Memorize": [f"記法 {word}" for word in WORDS],
+    })
+    # 兩題已逾期，檢查 overdue 天數在兩條路徑上一致
+    data["next_review_date"] = [START - timedelta(days=3), START - timedelta(days=10)] + [pd.NaT] * (len(WORDS) - 2)
+    data["review_interval"] = [4, 6] + [0] * (len(WORDS) - 2)
+    return data
+
+
+def make_engine():
+    return QuizEngine(5, make_deck(), storage=DeckStorage(), clock=ManualClock(START))
+
+
+def overdue_days(engine, label):
+    now = datetime_to_seconds(engine.clock())
+    next_review = int(engine.cards.next_review_date[engine.cards.pos(label)])
+    return (now - next_review) // DAY_SECONDS if next_review != NAT and next_review <= now else 0
+
+
+class ApplyReviewsTest(unittest.TestCase):
+    # (題目, 輸入, 作答秒數)：完全正確、拼字錯誤、慢答、正好 time_limit、超時、答錯、題庫中另一個字、同題再答一次
+    BATCH = [
+        (1, "exacerbate", 1.0),
+        (4, "placaet", 4.0),
+        (0, "abstain", 3.5),
+        (5, "laconic", 5.0),
+        (6, "obdurate", 6.0),
+        (7, "revere", 1.5),
+        (3, "abrogate", 2.0),
+        (1, "exacerbaet", 2.5),
+        (4, "placate", 0.5),
+    ]
+
+    def test_matches_submit_answer(self):
+        single, batch = make_engine(), make_engine()
+        results = []
+        for label, text, elapsed in self.BATCH:
+            card = single.cards.card(label)
+            card['overdue_days'] = overdue_days(single, label)
+            results.append(single.submit_answer(card, text, elapsed, "Voc"))
+
+        labels = [label for label, _, _ in self.BATCH]
+        elapsed = [seconds for _, _, seconds in self.BATCH]
+        accuracy = [batch.match_answer(text, batch.cards.card(label), "Voc") for label, text, _ in self.BATCH]
+        qualities = answer_quality(accuracy, elapsed, batch.time_limit)
+        frame = batch.apply_reviews(labels, qualities, elapsed_times=elapsed, correct=np.asarray(accuracy) >= 0.7)
+
+        self.assertEqual(frame['quality'].tolist(), [result.quality for result in results])
+        self.assertEqual(frame['correct'].tolist(), [result.correct for result in results])
+        for col in META_DEFAULTS:
+            np.testing.assert_array_equal(getattr(batch.cards, col), getattr(single.cards, col), err_msg=col)
+
+    def test_default_correct_is_quality_heuristic(self):
+        # 拼字錯誤又答得慢：submit_answer 算答對，但 quality 只有 2，預設的 quality >= 3 會判為答錯
+        engine = make_engine()
+        result = engine.submit_answer(engine.cards.card(4), "placaet", 4.0, "Voc")
+        self.assertTrue(result.correct)
+        self.assertEqual(result.quality, 2)
+        frame = make_engine().apply_reviews([4], [result.quality], elapsed_times=[4.0])
+        self.assertFalse(frame['correct'].iloc[0])
+
+
+if __name__ == "__main__":
+    unittest.main()